@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Benchmarks of Bugzilla access against local stand-in server.
+'''
+
+import datetime
+
+import pytest
+
+from suseapi.browser import extract_form
+from suseapi.bugzilla import (
+    BUG_COMMENTS_RE, Bugzilla, close_pool, create_parse_pool, decode_bugs,
+    encode_bugs,
+)
+from suseapi.responsecache import ResponseCache
+
+import servers
+
+
+def get_bugzilla(server, response_cache=None):
+    '''
+    Returns anonymous Bugzilla connected to stand-in server.
+    '''
+    return Bugzilla(
+        '', '', base=server.url, transport='urllib3',
+        response_cache=response_cache
+    )
+
+
+@pytest.mark.parametrize('count', [1, 100, 500])
+def test_get_bugs(benchmark, peak_memory, bugzilla_server, count):
+    '''
+    Fetching and parsing bugs.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    ids = list(range(100000, 100000 + count))
+    benchmark.extra_info['items'] = count
+    peak_memory(bugzilla.get_bugs, ids)
+    bugs = benchmark(bugzilla.get_bugs, ids)
+    assert len(bugs) == count
+
+
+@pytest.mark.parametrize('processes', [0, 2, 4])
+def test_parse_bugs_processes(benchmark, processes):
+    '''
+    Parsing bugs using process pool.
+    '''
+    bugzilla = Bugzilla('', '', transport='urllib3')
+    if processes:
+        bugzilla.parse_pool = create_parse_pool(processes)
+    ids = list(range(100000, 101000))
+    data = servers.render_bugs(ids).decode('utf-8')
+    benchmark.extra_info['items'] = len(ids)
+    benchmark.extra_info['processes'] = processes
+    try:
+        bugs = benchmark(bugzilla._parse_bugs, data, ids, False, False)
+    finally:
+        if processes:
+            close_pool(bugzilla.parse_pool)
+    assert len(bugs) == len(ids)
+
+
+def test_extract_form(benchmark):
+    '''
+    Extracting update form from bug page with long history.
+    '''
+    data = servers.render_bug_page(3000).decode('utf-8')
+    benchmark.extra_info['bytes'] = len(data)
+    form = benchmark(extract_form, data, 'changeform', '', BUG_COMMENTS_RE)
+    assert form.form_fields()['longdesclength'] == '3'
+
+
+def test_get_bugs_fields(benchmark, peak_memory, bugzilla_server):
+    '''
+    Fetching and parsing bugs with only few fields.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    ids = list(range(100000, 100500))
+    fields = ('bug_status', 'assigned_to', 'delta_ts')
+    benchmark.extra_info['items'] = len(ids)
+    peak_memory(bugzilla.get_bugs, ids, fields=fields)
+    bugs = benchmark(bugzilla.get_bugs, ids, fields=fields)
+    assert len(bugs) == len(ids)
+    assert not bugs[0].comments
+
+
+def test_do_search(benchmark, peak_memory, bugzilla_server):
+    '''
+    Searching for bugs.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    startdate = datetime.datetime(2013, 10, 1)
+    benchmark.extra_info['items'] = servers.SEARCH_SIZE
+    peak_memory(bugzilla.get_recent_bugs, startdate)
+    bugs = benchmark(bugzilla.get_recent_bugs, startdate)
+    assert len(bugs) == benchmark.extra_info['items']
+
+
+def test_search_then_fetch(benchmark, bugzilla_server):
+    '''
+    Searching for bugs and then fetching them.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    startdate = datetime.datetime(2013, 10, 1)
+    benchmark.extra_info['items'] = servers.SEARCH_SIZE
+
+    def search_then_fetch():
+        '''
+        Fetches all bugs after the search is done.
+        '''
+        return bugzilla.get_bugs(bugzilla.get_recent_bugs(startdate))
+
+    bugs = benchmark(search_then_fetch)
+    assert len(bugs) == benchmark.extra_info['items']
+
+
+def test_search_bugs(benchmark, peak_memory, bugzilla_server):
+    '''
+    Pipelined searching and fetching of bugs.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    params = [('chfieldto', 'Now')]
+    benchmark.extra_info['items'] = servers.SEARCH_SIZE
+
+    def search_bugs():
+        '''
+        Fetches bugs while the search is paged.
+        '''
+        return list(bugzilla.search_bugs(params, page_size=200))
+
+    peak_memory(search_bugs)
+    bugs = benchmark(search_bugs)
+    assert len(bugs) == benchmark.extra_info['items']
+
+
+def test_get_bugs_replay(benchmark, peak_memory, bugzilla_server, tmpdir):
+    '''
+    Fetching and parsing bugs replayed from response cache.
+    '''
+    cache = ResponseCache(str(tmpdir))
+    ids = list(range(100000, 100500))
+    get_bugzilla(bugzilla_server, cache).get_bugs(ids)
+    cache.replay = True
+    bugzilla = get_bugzilla(bugzilla_server, cache)
+    benchmark.extra_info['items'] = len(ids)
+    peak_memory(bugzilla.get_bugs, ids)
+    bugs = benchmark(bugzilla.get_bugs, ids)
+    assert len(bugs) == len(ids)
+
+
+def test_decode_bugs(benchmark, bugzilla_server):
+    '''
+    Loading bugs from serialized records.
+    '''
+    bugzilla = get_bugzilla(bugzilla_server)
+    ids = list(range(100000, 100500))
+    data = encode_bugs(bugzilla.get_bugs(ids))
+    benchmark.extra_info['items'] = len(ids)
+    benchmark.extra_info['bytes'] = len(data)
+    bugs = benchmark(decode_bugs, data)
+    assert len(bugs) == len(ids)
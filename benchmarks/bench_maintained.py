@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Benchmarks of maintained data loading on synthetic data.
+'''
+
+import os
+
+from suseapi.maintained import (
+    load_maintained_data, load_maintained_data_cached, MaintainedIndex,
+    dump_maintained_map, load_maintained_map,
+)
+
+
+def load_all(base_dir):
+    '''
+    Loads all maintained data into a list.
+    '''
+    return list(load_maintained_data(base_dir))
+
+
+def test_load_maintained_data(benchmark, peak_memory, maintained_dir):
+    '''
+    Sequential parsing of all files.
+    '''
+    peak_memory(load_all, maintained_dir)
+    assert len(benchmark(load_all, maintained_dir)) == 500
+
+
+def test_load_maintained_data_cached(benchmark, peak_memory, maintained_dir,
+                                     tmpdir):
+    '''
+    Loading unchanged checkout from cache.
+    '''
+    cache_file = os.path.join(str(tmpdir), 'cache')
+    load_maintained_data_cached(maintained_dir, cache_file)
+    peak_memory(load_maintained_data_cached, maintained_dir, cache_file)
+    result = benchmark(
+        load_maintained_data_cached, maintained_dir, cache_file
+    )
+    assert len(result) == 500
+
+
+def test_maintained_index(benchmark, maintained_dir):
+    '''
+    Package lookups using index.
+    '''
+    index = MaintainedIndex(load_all(maintained_dir))
+
+    def lookup():
+        '''
+        Looks up several packages.
+        '''
+        return [
+            len(index.by_package('package-{0}'.format(pos)))
+            for pos in range(0, 3000, 10)
+        ]
+
+    assert all(benchmark(lookup))
+
+
+def test_load_maintained_map(benchmark, peak_memory, maintained_dir, tmpdir):
+    '''
+    Loading memory mapped data and iterating over packages.
+    '''
+    filename = os.path.join(str(tmpdir), 'map')
+    dump_maintained_map(load_all(maintained_dir), filename)
+
+    def load():
+        '''
+        Loads all packages from the map.
+        '''
+        mapped = load_maintained_map(filename)
+        try:
+            return sum([len(product.packages) for product in mapped])
+        finally:
+            mapped.close()
+
+    peak_memory(load)
+    assert benchmark(load) == 500 * 1500
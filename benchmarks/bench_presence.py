@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Benchmarks of presence access against local stand-in server.
+'''
+
+from suseapi.presence import Presence
+
+
+def test_get_presence_data(benchmark, peak_memory, presence_server):
+    '''
+    Querying and parsing presence data without cache.
+    '''
+    presence = Presence([('127.0.0.1', True)], presence_server.port)
+
+    def get_presence_data():
+        '''
+        Gets presence data bypassing the cache.
+        '''
+        # pylint: disable=protected-access
+        presence._cache.clear()
+        return presence.get_presence_data('mcihar')
+
+    peak_memory(get_presence_data)
+    assert len(benchmark(get_presence_data)) == 3
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Benchmarks of product name manipulations.
+'''
+
+from suseapi.products import codestream_name, codestream_names
+from suseapi.test_products import (
+    CODESTREAM_SPELLINGS, legacy_codestream_name,
+)
+
+EXPECTED = [legacy_codestream_name(name) for name in CODESTREAM_SPELLINGS]
+
+
+def convert_legacy():
+    '''
+    Converts all spellings using original implementation.
+    '''
+    return [legacy_codestream_name(name) for name in CODESTREAM_SPELLINGS]
+
+
+def convert():
+    '''
+    Converts all spellings one by one.
+    '''
+    return [codestream_name(name) for name in CODESTREAM_SPELLINGS]
+
+
+def test_legacy_codestream_name(benchmark):
+    '''
+    Reference speed of original implementation.
+    '''
+    assert benchmark(convert_legacy) == EXPECTED
+
+
+def test_codestream_name_uncached(benchmark, peak_memory):
+    '''
+    Speed of table driven implementation without memoization.
+    '''
+    codestream_name.cache_clear()
+    peak_memory(convert)
+    result = benchmark.pedantic(
+        convert, setup=codestream_name.cache_clear, rounds=200
+    )
+    assert result == EXPECTED
+
+
+def test_codestream_name(benchmark):
+    '''
+    Speed of memoized implementation.
+    '''
+    assert benchmark(convert) == EXPECTED
+
+
+def test_codestream_names(benchmark):
+    '''
+    Speed of bulk conversion.
+    '''
+    assert benchmark(codestream_names, CODESTREAM_SPELLINGS) == EXPECTED
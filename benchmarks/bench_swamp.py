@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Benchmarks of SWAMP access against local stand-in server.
+'''
+
+from suseapi.swamp import SWAMP
+
+
+def test_do_get_property(benchmark, swamp_server):
+    '''
+    Single SOAP call.
+    '''
+    swamp = SWAMP('user', 'password', swamp_server.url + '/swamp?wsdl')
+    assert benchmark(swamp.doGetProperty, 'SWAMP_VERSION') == '1.7.2'
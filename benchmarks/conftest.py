@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Fixtures for benchmarks.
+'''
+
+import gc
+import os
+
+import pytest
+
+import servers
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+@pytest.fixture(scope='session')
+def bugzilla_server():
+    '''
+    Bugzilla stand-in server.
+    '''
+    server = servers.start_bugzilla()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope='session')
+def presence_server():
+    '''
+    Presence stand-in server.
+    '''
+    server = servers.start_presence()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope='session')
+def swamp_server():
+    '''
+    SWAMP stand-in server.
+    '''
+    server = servers.start_swamp()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope='session')
+def maintained_dir(tmpdir_factory):
+    '''
+    Synthetic maintained-CD directory.
+    '''
+    return servers.create_maintained_dir(
+        os.path.join(str(tmpdir_factory.mktemp('maintained')), 'data')
+    )
+
+
+@pytest.fixture
+def peak_memory(benchmark):
+    '''
+    Returns function measuring peak memory usage of a call.
+
+    The peak is stored in extra info of the benchmark, so it is saved and
+    compared together with timings.
+    '''
+    def measure(function, *args, **kwargs):
+        '''
+        Calls function with tracing memory allocations.
+        '''
+        if tracemalloc is None:
+            return function(*args, **kwargs)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = function(*args, **kwargs)
+            benchmark.extra_info['peak_memory'] = (
+                tracemalloc.get_traced_memory()[1]
+            )
+        finally:
+            tracemalloc.stop()
+        return result
+    return measure
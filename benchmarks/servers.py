@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Local stand-in servers for benchmarks.
+
+The servers replay recorded responses from the testsuite data, so the
+benchmarks can run offline.
+'''
+
+import os
+import re
+import threading
+
+from lxml import etree
+
+# pylint: disable=import-error
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+# pylint: disable=import-error
+from six.moves.socketserver import (
+    BaseRequestHandler, TCPServer, ThreadingMixIn,
+)
+# pylint: disable=import-error
+from six.moves.urllib.parse import parse_qsl, urlparse
+
+from suseapi.test_presence import RESPONSE as PRESENCE_RESPONSE
+
+TEST_DATA = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'suseapi',
+    'testdata',
+)
+
+# Number of entries returned by search
+SEARCH_SIZE = 1000
+
+
+def load_template(filename, tag):
+    '''
+    Loads recorded XML and splits it to header, first element and footer.
+    '''
+    with open(os.path.join(TEST_DATA, filename), 'rb') as handle:
+        data = handle.read()
+    closing = b'</' + tag + b'>'
+    start = data.index(b'<' + tag + b'>')
+    first = data.index(closing) + len(closing)
+    end = data.rindex(closing) + len(closing)
+    return data[:start], data[start:first], data[end:]
+
+
+BUG_HEADER, BUG_TEMPLATE, BUG_FOOTER = load_template(
+    'bug-81873.xml', b'bug'
+)
+SEARCH_HEADER, SEARCH_TEMPLATE, SEARCH_FOOTER = load_template(
+    'bug-list.xml', b'entry'
+)
+BUG_ID_MATCH = re.compile(br'<bug_id>\d+</bug_id>')
+ENTRY_ID_MATCH = re.compile(br'id=\d+')
+
+
+def project_bug(fields):
+    '''
+    Returns bug template containing only given fields.
+    '''
+    if not fields:
+        return BUG_TEMPLATE
+    bug = etree.fromstring(BUG_TEMPLATE)
+    for element in list(bug):
+        if element.tag not in fields:
+            bug.remove(element)
+    return etree.tostring(bug)
+
+
+def render_bugs(ids, fields=None):
+    '''
+    Renders show_bug XML for given bug ids.
+    '''
+    template = project_bug(fields)
+    return BUG_HEADER + b''.join([
+        BUG_ID_MATCH.sub(
+            '<bug_id>{0}</bug_id>'.format(bugid).encode('ascii'),
+            template
+        )
+        for bugid in ids
+    ]) + BUG_FOOTER
+
+
+def render_bug_page(comments):
+    '''
+    Renders HTML bug page with given number of comments.
+    '''
+    with open(os.path.join(TEST_DATA, 'bug-872984.html'), 'rb') as handle:
+        data = handle.read()
+    start = data.index(b'<div id="c1"')
+    end = data.index(b'<div id="c2"')
+    return data[:end] + data[start:end] * comments + data[end:]
+
+
+def render_search(count=SEARCH_SIZE, offset=0):
+    '''
+    Renders Atom search results with given number of entries.
+    '''
+    return SEARCH_HEADER + b''.join([
+        ENTRY_ID_MATCH.sub(
+            'id={0}'.format(100000 + pos).encode('ascii'),
+            SEARCH_TEMPLATE
+        )
+        for pos in range(offset, offset + count)
+    ]) + SEARCH_FOOTER
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    '''
+    Threaded HTTP server.
+    '''
+    daemon_threads = True
+
+
+class ThreadingTCPServer(ThreadingMixIn, TCPServer):
+    '''
+    Threaded TCP server.
+    '''
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class BugzillaHandler(BaseHTTPRequestHandler):
+    '''
+    Bugzilla stand-in replaying recorded XML.
+    '''
+    search = render_search()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        return
+
+    def get_params(self):
+        '''
+        Returns request parameters from both URL and body.
+        '''
+        parsed = urlparse(self.path)
+        params = parse_qsl(parsed.query)
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            params += parse_qsl(self.rfile.read(length).decode('utf-8'))
+        return parsed.path, params
+
+    def reply(self, body, content_type='text/xml'):
+        '''
+        Sends response.
+        '''
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        '''
+        Handles GET request.
+        '''
+        path, params = self.get_params()
+        if path == '/show_bug.cgi':
+            self.reply(render_bugs(
+                [value for key, value in params if key == 'id'],
+                [value for key, value in params if key == 'includefield'],
+            ))
+        elif path == '/buglist.cgi':
+            params = dict(params)
+            if 'limit' in params:
+                offset = int(params.get('offset', 0))
+                count = min(int(params['limit']), SEARCH_SIZE - offset)
+                self.reply(render_search(max(0, count), offset))
+            else:
+                self.reply(self.search)
+        elif path == '/index.cgi':
+            self.reply(
+                b'<html><body><a href="#">Log out</a></body></html>',
+                'text/html'
+            )
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        '''
+        Handles POST request.
+        '''
+        self.do_GET()
+
+
+class PresenceHandler(BaseRequestHandler):
+    '''
+    Presence stand-in sending recorded response.
+    '''
+    def handle(self):
+        self.request.sendall(PRESENCE_RESPONSE)
+
+
+SWAMP_NS = 'http://swamp.suse.de/'
+
+SWAMP_WSDL = '''<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{ns}"
+    targetNamespace="{ns}">
+  <types>
+    <xsd:schema targetNamespace="{ns}" elementFormDefault="qualified">
+      <xsd:element name="doGetProperty">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="name" type="xsd:string"/>
+            <xsd:element name="user" type="xsd:string"/>
+            <xsd:element name="password" type="xsd:string"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+      <xsd:element name="doGetPropertyResponse">
+        <xsd:complexType>
+          <xsd:sequence>
+            <xsd:element name="doGetPropertyReturn" type="xsd:string"/>
+          </xsd:sequence>
+        </xsd:complexType>
+      </xsd:element>
+    </xsd:schema>
+  </types>
+  <message name="doGetPropertyRequest">
+    <part name="parameters" element="tns:doGetProperty"/>
+  </message>
+  <message name="doGetPropertyResponse">
+    <part name="parameters" element="tns:doGetPropertyResponse"/>
+  </message>
+  <portType name="SWAMP">
+    <operation name="doGetProperty">
+      <input message="tns:doGetPropertyRequest"/>
+      <output message="tns:doGetPropertyResponse"/>
+    </operation>
+  </portType>
+  <binding name="SWAMPBinding" type="tns:SWAMP">
+    <soap:binding style="document"
+        transport="http://schemas.xmlsoap.org/soap/http"/>
+    <operation name="doGetProperty">
+      <soap:operation soapAction=""/>
+      <input><soap:body use="literal"/></input>
+      <output><soap:body use="literal"/></output>
+    </operation>
+  </binding>
+  <service name="swamp">
+    <port name="swamp" binding="tns:SWAMPBinding">
+      <soap:address location="{location}"/>
+    </port>
+  </service>
+</definitions>
+'''
+
+SWAMP_RESPONSE = '''<?xml version="1.0" encoding="UTF-8"?>
+<soapenv:Envelope
+    xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">
+  <soapenv:Body>
+    <doGetPropertyResponse xmlns="{ns}">
+      <doGetPropertyReturn>1.7.2</doGetPropertyReturn>
+    </doGetPropertyResponse>
+  </soapenv:Body>
+</soapenv:Envelope>
+'''.format(ns=SWAMP_NS).encode('utf-8')
+
+
+class SWAMPHandler(BugzillaHandler):
+    '''
+    SWAMP SOAP stand-in implementing doGetProperty.
+    '''
+    def do_GET(self):
+        location = 'http://{0}:{1}/swamp'.format(*self.server.server_address)
+        self.reply(
+            SWAMP_WSDL.format(ns=SWAMP_NS, location=location).encode('utf-8')
+        )
+
+    def do_POST(self):
+        self.get_params()
+        self.reply(SWAMP_RESPONSE)
+
+
+class StandInServer(object):
+    '''
+    Runs server in background thread.
+    '''
+    def __init__(self, server_class, handler):
+        self.server = server_class(('127.0.0.1', 0), handler)
+        self.port = self.server.server_address[1]
+        self.url = 'http://127.0.0.1:{0}'.format(self.port)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    def start(self):
+        '''
+        Starts serving requests.
+        '''
+        self.thread.start()
+        return self
+
+    def stop(self):
+        '''
+        Stops the server.
+        '''
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+def start_bugzilla():
+    '''
+    Starts Bugzilla stand-in.
+    '''
+    return StandInServer(ThreadingHTTPServer, BugzillaHandler).start()
+
+
+def start_presence():
+    '''
+    Starts presence stand-in.
+    '''
+    return StandInServer(ThreadingTCPServer, PresenceHandler).start()
+
+
+def start_swamp():
+    '''
+    Starts SWAMP stand-in.
+    '''
+    return StandInServer(ThreadingHTTPServer, SWAMPHandler).start()
+
+
+MAINTAINED_TEMPLATE = '''Distribution: {name}
+Distributionstring: {name}
+Distributionversion: 11-0
+ProductType: {product_type}
+PackTrack: SLES11/{name}
+
+Packages on CD:
+'''
+
+
+def create_maintained_dir(path, products=500, packages=3000,
+                          per_product=1500):
+    '''
+    Creates synthetic maintained-CD directory.
+    '''
+    os.makedirs(path)
+    with open(os.path.join(path, '.svn-entries'), 'w') as handle:
+        handle.write('10\n\ndir\n4242\n')
+    for pos in range(products):
+        name = 'sle11-sp{0}-product{1}'.format(pos % 4, pos)
+        with open(os.path.join(path, name), 'w') as handle:
+            handle.write(MAINTAINED_TEMPLATE.format(
+                name=name,
+                product_type='maintained' if pos % 3 else 'box',
+            ))
+            for package in range(per_product):
+                handle.write('package-{0}\n'.format(
+                    (pos * 7 + package) % packages
+                ))
+    return path
@@ -47,6 +47,7 @@ setup(
     package_dir={'suseapi': 'suseapi'},
     package_data={'suseapi': [
         'testdata/*.xml',
+        'testdata/*.html',
         'testdata/maintained/opensuse',
         'testdata/maintained/sles',
         'testdata/maintained/_svn/*',
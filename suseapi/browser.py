@@ -21,20 +21,61 @@
 '''
 Web browser wrapper for convenient scraping of web based services.
 '''
+from collections import OrderedDict
+import copy
+import random
+import re
 import socket
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
 
 # import mechanize
 import grab
+import lxml.html
+from six import text_type
 # pylint: disable=import-error
 from six.moves.http_client import HTTPException
 # pylint: disable=import-error
 from six.moves.urllib.error import URLError
 # pylint: disable=import-error
-from six.moves.urllib.parse import urlencode
+from six.moves.urllib.parse import urlencode, urljoin, urlparse
+from weblib.error import DataNotFound
+
+from suseapi.instrument import measure, record_cache
 
 # The default timeout has to be an integer.
 DEFAULT_TIMEOUT = 50
 
+# Compression we can handle in all transports
+ACCEPT_ENCODING = 'gzip, deflate'
+
+# Number of URLs to remember validators for conditional requests
+VALIDATORS_SIZE = 64
+
+# Maximal total size of bodies kept for conditional requests
+VALIDATORS_BYTES = 8 * 1024 * 1024
+
+# End of HTML form
+FORM_END_RE = re.compile(r'</form\s*>', re.IGNORECASE)
+
+# Input types which are never submitted with the form
+FORM_SKIP_TYPES = frozenset((
+    'submit', 'button', 'image', 'reset', 'file',
+))
+
+# Status codes which indicate temporary server side failure
+RETRY_STATUSES = frozenset((502, 503, 504))
+
+# Circuit breaker states
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half-open'
+
+# Shared per host circuit breakers
+CIRCUIT_BREAKERS = {}
+CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
 
 class WebScraperError(Exception):
     '''
@@ -45,6 +86,188 @@ class WebScraperError(Exception):
         self.original = original
 
 
+class CircuitOpenError(WebScraperError):
+    '''
+    Raised when request is refused by open circuit breaker.
+    '''
+
+
+class ResponseCacheMiss(WebScraperError):
+    '''
+    Raised in replay mode when response is not cached.
+    '''
+
+
+def get_error_code(error):
+    '''
+    Returns HTTP status code for the error or None for transport errors.
+    '''
+    return getattr(error.original, 'code', None)
+
+
+def is_server_failure(error):
+    '''
+    Checks whether error indicates server or transport failure.
+    '''
+    if isinstance(error, CircuitOpenError):
+        return False
+    code = get_error_code(error)
+    return code is None or code >= 500
+
+
+def get_retry_after(error):
+    '''
+    Returns delay in seconds requested by Retry-After header or None.
+    '''
+    headers = getattr(error.original, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0, mktime_tz(parsed) - time.time())
+
+
+class RetryPolicy(object):
+    '''
+    Retry policy with exponential backoff and jitter.
+
+    Only idempotent requests are retried and only on transport errors or
+    statuses listed in statuses. Retry-After header is honored as long as
+    it does not exceed max_backoff.
+    '''
+    def __init__(self, retries=3, backoff=0.5, max_backoff=30, jitter=0.5,
+                 statuses=RETRY_STATUSES):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = statuses
+        self.sleep = time.sleep
+
+    def should_retry(self, error, attempt):
+        '''
+        Checks whether request should be retried after an error.
+        '''
+        if attempt >= self.retries or isinstance(error, CircuitOpenError):
+            return False
+        code = get_error_code(error)
+        return code is None or code in self.statuses
+
+    def get_delay(self, error, attempt):
+        '''
+        Returns delay before next attempt or None to give up.
+        '''
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        delay *= 1 - self.jitter * random.random()
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.max_backoff:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker(object):
+    '''
+    Circuit breaker to stop hammering failing server.
+
+    After threshold consecutive failures the circuit opens and requests
+    are refused for reset_timeout seconds. Then single trial request is
+    let through and its result decides whether the circuit closes again.
+    '''
+    def __init__(self, name='', threshold=5, reset_timeout=30):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened = None
+        self.rejected = 0
+        self.trial = False
+
+    def allow(self):
+        '''
+        Checks whether request can be performed.
+        '''
+        with self.lock:
+            if self.state == CIRCUIT_OPEN:
+                if time.time() - self.opened < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = CIRCUIT_HALF_OPEN
+                self.trial = False
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self.trial:
+                    self.rejected += 1
+                    return False
+                self.trial = True
+            return True
+
+    def record_success(self):
+        '''
+        Records successful request.
+        '''
+        with self.lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self.opened = None
+            self.trial = False
+
+    def record_failure(self):
+        '''
+        Records failed request.
+        '''
+        with self.lock:
+            self.failures += 1
+            if (self.state == CIRCUIT_HALF_OPEN or
+                    self.failures >= self.threshold):
+                self.state = CIRCUIT_OPEN
+                self.opened = time.time()
+                self.trial = False
+
+    def get_state(self):
+        '''
+        Returns dictionary describing current state.
+        '''
+        with self.lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opened': self.opened,
+            }
+
+
+def get_circuit_breaker(url, threshold=5, reset_timeout=30):
+    '''
+    Returns circuit breaker shared by all clients of given host.
+    '''
+    host = urlparse(url).netloc
+    with CIRCUIT_BREAKERS_LOCK:
+        if host not in CIRCUIT_BREAKERS:
+            CIRCUIT_BREAKERS[host] = CircuitBreaker(
+                host, threshold, reset_timeout
+            )
+        return CIRCUIT_BREAKERS[host]
+
+
+def get_circuit_states():
+    '''
+    Returns state of all shared circuit breakers keyed by host.
+    '''
+    with CIRCUIT_BREAKERS_LOCK:
+        breakers = list(CIRCUIT_BREAKERS.values())
+    return dict((breaker.name, breaker.get_state()) for breaker in breakers)
+
+
 def webscraper_safely(call, *args, **kwargs):
     '''
     Wrapper to handle errors in HTTP requests.
@@ -76,15 +299,183 @@ def webscraper_safely(call, *args, **kwargs):
         raise WebScraperError('IO error: {0!s}'.format(exc), exc)
 
 
+def encode_native(value):
+    '''
+    Encodes unicode value to UTF-8 on Python 2.
+    '''
+    if isinstance(value, text_type) and not isinstance(value, str):
+        return value.encode('utf-8')
+    return value
+
+
+class HTMLForm(object):
+    '''
+    Form fields extracted from HTML page.
+
+    It provides form_fields and set_input methods compatible with grab
+    document, so it can be used instead of it for simple forms.
+    '''
+    def __init__(self, url, method='post'):
+        self.url = url
+        self.method = method
+        self.fields = OrderedDict()
+        self.names = set()
+        self.checkables = {}
+
+    def add(self, name, value):
+        '''
+        Adds field value, repeated names are stored as list.
+        '''
+        if name not in self.fields:
+            self.fields[name] = value
+        elif isinstance(self.fields[name], list):
+            self.fields[name].append(value)
+        else:
+            self.fields[name] = [self.fields[name], value]
+
+    def form_fields(self):
+        '''
+        Returns dictionary with current field values.
+        '''
+        return OrderedDict(
+            (name, list(value) if isinstance(value, list) else value)
+            for name, value in self.fields.items()
+        )
+
+    def set_input(self, name, value):
+        '''
+        Sets field value, checkboxes are set using boolean.
+        '''
+        if name not in self.names:
+            raise DataNotFound('Field not found: {0}'.format(name))
+        if name in self.checkables and isinstance(value, bool):
+            if value:
+                self.fields[name] = self.checkables[name]
+            else:
+                self.fields.pop(name, None)
+        else:
+            self.fields[name] = value
+
+    def get_pairs(self):
+        '''
+        Returns list of name and value pairs to submit.
+        '''
+        result = []
+        for name, value in self.fields.items():
+            if isinstance(value, (list, tuple)):
+                result.extend([(name, item) for item in value])
+            else:
+                result.append((name, value))
+        # urlencode expects native strings, encode unicode on Python 2
+        if str is not text_type:
+            result = [
+                (encode_native(name), encode_native(value))
+                for name, value in result
+            ]
+        return result
+
+
+def get_form_html(data, name, skip=None):
+    '''
+    Returns HTML of form with given name, None if not found.
+
+    Regions matching skip regular expression are removed from the form.
+    '''
+    match = re.search(
+        r'<form\b[^>]*\bname\s*=\s*["\']?{0}\b'.format(re.escape(name)),
+        data, re.IGNORECASE
+    )
+    if match is None:
+        return None
+    end = FORM_END_RE.search(data, match.end())
+    html = data[match.start():end.end() if end else len(data)]
+    if skip is not None:
+        html = skip.sub('', html)
+    return html
+
+
+def get_element_value(element):
+    '''
+    Returns initial value of form element or None if it is not set.
+    '''
+    if element.tag == 'textarea':
+        return element.text_content()
+    if element.tag == 'select':
+        values = []
+        selected = []
+        for option in element.iter('option'):
+            value = option.get('value')
+            if value is None:
+                value = option.text_content().strip()
+            values.append(value)
+            if 'selected' in option.attrib:
+                selected.append(value)
+        if 'multiple' in element.attrib:
+            return selected or None
+        if selected:
+            return selected[-1]
+        return values[0] if values else None
+    return element.get('value') or ''
+
+
+def extract_form(data, name, url='', skip=None):
+    '''
+    Extracts form with given name from HTML, returns None if not found.
+
+    Only the form is parsed, optionally without regions matching skip
+    regular expression.
+    '''
+    html = get_form_html(data, name, skip)
+    if html is None:
+        return None
+    element = lxml.html.document_fromstring(html).find('.//form')
+    if element is None:
+        return None
+    form = HTMLForm(
+        urljoin(url, element.get('action') or ''),
+        (element.get('method') or 'get').lower()
+    )
+    for field in element.iter('input', 'select', 'textarea'):
+        field_name = field.get('name')
+        if not field_name or 'disabled' in field.attrib:
+            continue
+        kind = (field.get('type') or 'text').lower()
+        if field.tag == 'input' and kind in FORM_SKIP_TYPES:
+            continue
+        form.names.add(field_name)
+        if field.tag == 'input' and kind in ('checkbox', 'radio'):
+            value = field.get('value') or 'on'
+            form.checkables.setdefault(field_name, value)
+            if 'checked' in field.attrib:
+                form.add(field_name, value)
+            continue
+        value = get_element_value(field)
+        if isinstance(value, list):
+            form.fields[field_name] = value
+        elif value is not None:
+            form.add(field_name, value)
+    return form
+
+
 class WebScraper(object):
     '''
     Web based scraper using mechanize.
     '''
     def __init__(self, user, password, base, useragent=None,
-                 transport='pycurl'):
+                 transport='pycurl', retry_policy=None, circuit_breaker=None,
+                 response_cache=None, use_get=False):
         self.base = base
         self.user = user
         self.password = password
+        self.retry_policy = retry_policy
+        if circuit_breaker is True:
+            circuit_breaker = get_circuit_breaker(base)
+        elif not circuit_breaker:
+            circuit_breaker = None
+        self.circuit_breaker = circuit_breaker
+        self.response_cache = response_cache
+        # Send parameters of read only requests in query string
+        self.use_get = use_get
 
         self.cookie_set = False
 
@@ -92,6 +483,7 @@ class WebScraper(object):
         self.browser = grab.Grab(
             timeout=DEFAULT_TIMEOUT
         )
+        self.transport = transport
         self.browser.setup_transport(transport)
         if transport == "urllib3":
             import urllib3
@@ -105,9 +497,18 @@ class WebScraper(object):
         # Are we anonymous?
         self.anonymous = (user == '')
 
+        # Ask for compressed content, pycurl needs to be told separately
+        self.headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        self.browser.setup(encoding='gzip')
+
         # Identify ourselves
         if useragent is not None:
-            self.browser.setup(headers={'User-agent': useragent})
+            self.headers['User-agent'] = useragent
+        self.browser.setup(headers=self.headers)
+
+        # Validators for conditional requests, keyed by URL
+        self.validators = OrderedDict()
+        self.validators_bytes = 0
 
     def _get_req_url(self, action):
         '''
@@ -115,9 +516,67 @@ class WebScraper(object):
         '''
         return '%s/%s' % (self.base, action)
 
+    def _perform(self, measurement, call, *args, **kwargs):
+        '''
+        Performs call guarded by circuit breaker and retry policy.
+
+        The call is retried only when retry is enabled and it is
+        idempotent.
+        '''
+        retry = kwargs.pop('retry', False)
+        policy = self.retry_policy if retry else None
+        breaker = self.circuit_breaker
+        attempt = 0
+        while True:
+            if breaker is not None and not breaker.allow():
+                raise CircuitOpenError(
+                    'Circuit open for {0}'.format(breaker.name)
+                )
+            try:
+                result = webscraper_safely(call, *args, **kwargs)
+            except WebScraperError as error:
+                if breaker is not None:
+                    if is_server_failure(error):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if policy is None or not policy.should_retry(error, attempt):
+                    raise
+                delay = policy.get_delay(error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                measurement.retries += 1
+                policy.sleep(delay)
+                continue
+            except Exception:
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            if breaker is not None:
+                breaker.record_success()
+            return result
+
     def request(self, action, paramlist=None, **kwargs):
         '''
         Performs single request on a server (loads single page).
+
+        Only requests without parameters are retried.
+        '''
+        return self._request(action, paramlist, kwargs, False)
+
+    def fetch(self, action, paramlist=None, **kwargs):
+        '''
+        Performs read only request on a server.
+
+        The request has no side effects, so it is retried even when
+        parameters are posted and it can be served from response cache.
+        '''
+        return self._request(action, paramlist, kwargs, True)
+
+    def _request(self, action, paramlist, kwargs, idempotent):
+        '''
+        Performs single request, idempotent requests are retried.
         '''
         url = self._get_req_url(action)
         if paramlist is not None:
@@ -126,25 +585,171 @@ class WebScraper(object):
             params = None
         else:
             params = urlencode(kwargs)
-        return webscraper_safely(
-            self.browser.go,
-            url, post=params
-        )
+        if idempotent and self.use_get and params:
+            url = '{0}{1}{2}'.format(url, '&' if '?' in url else '?', params)
+            params = None
+        if not idempotent:
+            self._check_replay(url)
+        with measure('browser', 'request') as measurement:
+            cache_key = None
+            if idempotent and self.response_cache is not None:
+                cache_key = self.response_cache.get_key(
+                    url, params, self.base, self.user
+                )
+                result = self._get_cached(url, cache_key, measurement)
+                if result is not None:
+                    return result
+            self.browser.setup(headers=self._get_headers(url, params))
+            result = self._perform(
+                measurement,
+                self.browser.go,
+                url, post=params, retry=idempotent or params is None
+            )
+            measurement.bytes = len(result.body or b'')
+            if params is None:
+                result = self._handle_validators(url, result, measurement)
+            if cache_key is not None and result.code == 200:
+                self.response_cache.set(
+                    cache_key, result.url, result.code, result.head,
+                    result.body
+                )
+            return result
+
+    def _check_replay(self, url):
+        '''
+        Raises ResponseCacheMiss for uncacheable request in replay mode.
+        '''
+        if self.response_cache is not None and self.response_cache.replay:
+            raise ResponseCacheMiss(
+                'Request can not be replayed: {0}'.format(url)
+            )
 
-    def submit(self):
+    def _get_cached(self, url, key, measurement):
         '''
-        Submits currently selected browser form.
+        Loads response from the response cache into browser.
         '''
-        return webscraper_safely(
-            self.browser.doc.submit,
+        data = self.response_cache.get(key)
+        record_cache('browser', 'response_cache', data is not None)
+        if data is None:
+            if self.response_cache.replay:
+                raise ResponseCacheMiss(
+                    'Response not cached: {0}'.format(url)
+                )
+            return None
+        measurement.bytes = len(data['body'])
+        return self._load_document(
+            data['url'], data['code'], data['head'], data['body']
         )
 
+    def _load_document(self, url, code, head, body):
+        '''
+        Loads stored response into browser.
+        '''
+        self.browser.setup_document(body, url=url, code=code, head=head)
+        # Parse headers from stored head
+        self.browser.doc.parse()
+        return self.browser.doc
+
+    def _get_headers(self, url, params):
+        '''
+        Returns headers for request, including conditional ones.
+        '''
+        if params is not None or url not in self.validators:
+            return self.headers
+        headers = dict(self.headers)
+        etag, modified = self.validators[url][:2]
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        return headers
+
+    def _handle_validators(self, url, result, measurement):
+        '''
+        Stores validators from response or reuses document for 304.
+
+        Only the body and headers are kept, bounded by count and total size.
+        '''
+        stored = self.validators.pop(url, None)
+        if stored is not None:
+            self.validators_bytes -= len(stored[5])
+            if result.code == 304:
+                record_cache('browser', 'conditional', True)
+                self._store_validators(url, stored)
+                return self._load_document(*stored[2:])
+            record_cache('browser', 'conditional', False)
+        etag = result.headers.get('ETag')
+        modified = result.headers.get('Last-Modified')
+        body = result.body or b''
+        if (result.code == 200 and (etag or modified) and
+                len(body) <= VALIDATORS_BYTES):
+            self._store_validators(url, (
+                etag, modified, result.url, result.code, result.head, body
+            ))
+        return result
+
+    def _store_validators(self, url, stored):
+        '''
+        Remembers validators and response, evicting oldest ones.
+        '''
+        self.validators[url] = stored
+        self.validators_bytes += len(stored[5])
+        while (len(self.validators) > VALIDATORS_SIZE or
+               self.validators_bytes > VALIDATORS_BYTES):
+            self.validators_bytes -= len(
+                self.validators.popitem(last=False)[1][5]
+            )
+
+    def submit(self, form=None):
+        '''
+        Submits currently selected browser form or given HTMLForm.
+        '''
+        self._check_replay(self.browser.doc.url if form is None else form.url)
+        with measure('browser', 'submit') as measurement:
+            self.browser.setup(headers=self.headers)
+            if form is None:
+                result = self._perform(
+                    measurement,
+                    self.browser.submit,
+                )
+            elif form.method == 'post':
+                result = self._perform(
+                    measurement,
+                    self.browser.go,
+                    form.url, post=urlencode(form.get_pairs())
+                )
+            else:
+                result = self._perform(
+                    measurement,
+                    self.browser.go,
+                    '{0}?{1}'.format(form.url, urlencode(form.get_pairs()))
+                )
+            if result is not None:
+                measurement.bytes = len(result.body or b'')
+            return result
+
+    def clone(self):
+        '''
+        Returns copy of the scraper with separate browser.
+
+        The copy shares configuration and cookies at the time of cloning,
+        so it can be used in other thread.
+        '''
+        other = copy.copy(self)
+        other.browser = self.browser.clone()
+        if self.transport == 'urllib3':
+            other.browser.setup_transport(self.transport)
+            other.browser.transport.pool = self.browser.transport.pool
+        other.validators = OrderedDict()
+        other.validators_bytes = 0
+        return other
+
     def set_cookies(self, cookies):
         '''
         Sets cookies needed for access.
         '''
         for cookie in cookies:
-            self.browser.cookies.set(cookie.name, cookie.value)
+            self.browser.cookies.cookiejar.set_cookie(cookie)
         self.cookie_set = True
 
     def get_cookies(self):
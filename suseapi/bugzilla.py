@@ -25,21 +25,45 @@ It uses XML to load the data (when applicable) and HTML forms to update it.
 '''
 
 # pylint: disable=import-error
-from six.moves.urllib.parse import urljoin
+from six.moves import queue
+# pylint: disable=import-error
+from six.moves.urllib.parse import urlencode, urljoin, urlparse
 # pylint: disable=import-error
 from lxml import etree as ElementTree
 import dateutil.parser
+from dateutil.tz import tzoffset, tzutc
+from datetime import datetime, timedelta
+import json
 import traceback
+import atexit
+import hashlib
 import re
 import logging
+import threading
+from multiprocessing.pool import Pool, ThreadPool
+from timeit import default_timer
 from bs4 import BeautifulSoup
 from weblib.error import DataNotFound
 
-from suseapi.browser import WebScraper, WebScraperError, webscraper_safely
+from suseapi.browser import (
+    RetryPolicy, WebScraper, WebScraperError, extract_form,
+)
+from suseapi.cacher import CacherMixin, DjangoCacherMixin
+from suseapi.instrument import HOOKS, Measurement, emit, measure
+from suseapi.sessionstore import DjangoSessionStore
+from suseapi.singleflight import MicroBatcher, SingleFlight
 from .compat import text_type
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 SR_MATCH = re.compile(r'\[(\d+)\]')
+SR_LINK_MATCH = re.compile(
+    r'<a\s[^>]*\bhref=["\']([^"\']*)["\'][^>]*>Report View</a>'
+)
 
 IGNORABLE_FIELDS = frozenset((
     'commentprivacy',
@@ -98,19 +122,361 @@ class BugzillaUpdateError(BugzillaConnectionError):
     pass
 
 
+class BugzillaMidAirCollision(BugzillaUpdateError):
+    '''Bug was changed by someone else while updating'''
+    pass
+
+
+ESCAPE_XML_MAP = dict([
+    (chr(orig), '\\x%02d' % orig) for orig in range(32)
+    # skipt newline, carriage return and tabulator chars
+    if orig not in (9, 10, 13)
+])
+ESCAPE_XML_RE = re.compile('|'.join([
+    re.escape(s) for s in sorted(ESCAPE_XML_MAP, key=len, reverse=True)
+]))
+
+# Fields always fetched and never fetched by get_bugs
+BUG_REQUIRED_FIELDS = frozenset(('bug_id',))
+BUG_EXCLUDED_FIELDS = frozenset(('attachmentdata',))
+
+# Outcomes of bug updates
+UPDATE_UPDATED = 'updated'
+UPDATE_UNCHANGED = 'unchanged'
+UPDATE_DRY_RUN = 'dry-run'
+UPDATE_FAILED = 'failed'
+
+# Keyword arguments of update_bug which are not form fields
+UPDATE_ARGUMENTS = frozenset((
+    'callback', 'callback_param', 'whiteboard_add', 'whiteboard_remove',
+))
+
+# Number of sessions and mid-air collision retries for update_bugs
+UPDATE_WORKERS = 4
+UPDATE_COLLISION_RETRIES = 2
+
+# Number of bugs changed by single mass change
+BULK_CHUNK = 50
+
+# Size of text chunks fed to the search parser
+SEARCH_CHUNK = 65536
+
+# Number of bugs fetched in single request and number of fetching threads
+# in search_bugs
+SEARCH_FETCH_CHUNK = 100
+SEARCH_FETCH_WORKERS = 4
+
+# Number of concurrent sessions for fetching SR ids
+SR_WORKERS = 4
+
+# Minimal number of bugs to parse in process pool
+PARSE_THRESHOLD = 200
+
+# Number of bugs in single task for parsing in process pool
+PARSE_CHUNK = 50
+
+# Comments on bug page, they contain no form fields
+BUG_COMMENTS_RE = re.compile(
+    r'<table class="bz_comment_table"[^<]*(?:<(?!/table>)[^<]*)*</table>'
+)
+
+# Single bug element in XML
+BUG_FRAGMENT_RE = re.compile(r'<bug\b[^>]*>.*?</bug>', re.DOTALL)
+
+# Version of serialized bug records
+BUG_RECORD_VERSION = 1
+
+# Bug attributes which are not plain text fields
+BUG_LIST_ATTRIBUTES = ('cc_list', 'groups', 'aliases', 'flags')
+BUG_DATE_ATTRIBUTES = ('delta_ts', 'creation_ts')
+BUG_SPECIAL_ATTRIBUTES = frozenset(
+    BUG_LIST_ATTRIBUTES + BUG_DATE_ATTRIBUTES +
+    ('comments', 'attachments', 'anonymous', 'fields', 'exclude')
+)
+
+# Columns of serialized comments and attachments, dates need conversion
+COMMENT_COLUMNS = ('who', 'bug_when', 'private', 'thetext')
+ATTACHMENT_COLUMNS = (
+    'attachid', 'desc', 'date', 'filename', 'type', 'size', 'attacher',
+    'ispatch', 'isobsolete',
+)
+DATE_COLUMNS = frozenset(('bug_when', 'date'))
+
+# Markers of encoded bug lists
+BUGS_MSGPACK = b'M'
+BUGS_JSON = b'J'
+
+EPOCH = datetime(1970, 1, 1)
+
+# Overlap in seconds when asking for new comments
+COMMENT_SYNC_OVERLAP = 1
+
+ATOM_ID = '{http://www.w3.org/2005/Atom}id'
+ATOM_ENTRY = '{http://www.w3.org/2005/Atom}entry'
+
+
 def escape_xml_text(data):
     '''
     Fix some XML errors in bugzilla xml, which confuse proper XML parser.
     '''
-    replacement_map = dict([
-        (chr(orig), '\\x%02d' % orig) for orig in range(32)
-        # skipt newline, carriage return and tabulator chars
-        if orig not in (9, 10, 13)
-    ])
+    return ESCAPE_XML_RE.sub(
+        lambda match: ESCAPE_XML_MAP[match.group(0)], data
+    )
+
+
+def parse_sr_link(url):
+    '''
+    Extracts SR ids from Report View link.
+    '''
+    # Split parts (URL encoded)
+    urlpart = [x for x in url.split('%26') if x[:7] == 'lsMSRID']
+
+    if not urlpart:
+        return []
+
+    # Find SR ids and convert to integers
+    return [int(x) for x in SR_MATCH.findall(urlpart[0])]
+
+
+def encode_datetime(value):
+    '''
+    Encodes datetime as seconds since epoch and UTC offset.
+    '''
+    if value is None:
+        return None
+    offset = value.utcoffset()
+    seconds = (value.replace(tzinfo=None) - EPOCH).total_seconds()
+    if offset is None:
+        return [seconds, None]
+    return [seconds, int(offset.total_seconds())]
+
+
+def decode_datetime(value):
+    '''
+    Decodes datetime encoded by encode_datetime.
+    '''
+    if value is None:
+        return None
+    result = EPOCH + timedelta(seconds=value[0])
+    if value[1] is None:
+        return result
+    if value[1] == 0:
+        return result.replace(tzinfo=tzutc())
+    return result.replace(tzinfo=tzoffset(None, value[1]))
+
+
+def encode_columns(items, columns):
+    '''
+    Converts list of dictionaries to dictionary of columns.
+    '''
+    return dict(
+        (
+            column,
+            [
+                encode_datetime(item[column]) if column in DATE_COLUMNS
+                else item[column]
+                for item in items
+            ]
+        )
+        for column in columns
+    )
+
+
+def decode_columns(data, columns):
+    '''
+    Converts dictionary of columns to list of dictionaries.
+    '''
+    values = [
+        [decode_datetime(value) for value in data[column]]
+        if column in DATE_COLUMNS else data[column]
+        for column in columns
+    ]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def to_utc(value):
+    '''
+    Converts datetime to UTC, naive values are considered UTC.
+    '''
+    if value.tzinfo is None:
+        return value.replace(tzinfo=tzutc())
+    return value.astimezone(tzutc())
+
+
+def parse_rpc_comment(comment):
+    '''
+    Converts comment from JSON-RPC to format used by Bug.
+    '''
+    return {
+        'who': comment.get('creator', comment.get('author')),
+        'bug_when': dateutil.parser.parse(comment['time']),
+        'private': bool(comment.get('is_private')),
+        'thetext': comment['text'],
+    }
+
+
+def restore_bug(cls, record):
+    '''
+    Creates bug from record, used for unpickling.
+    '''
+    return cls.from_record(record)
+
+
+def encode_bugs(bugs, use_msgpack=None):
+    '''
+    Encodes list of bugs into bytes.
+
+    The msgpack is used when available, JSON otherwise.
+    '''
+    if use_msgpack is None:
+        use_msgpack = msgpack is not None
+    records = [bug.to_record() for bug in bugs]
+    if use_msgpack:
+        return BUGS_MSGPACK + msgpack.packb(records, use_bin_type=True)
+    return BUGS_JSON + json.dumps(
+        records, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def decode_bugs(data, cls=None):
+    '''
+    Decodes list of bugs encoded by encode_bugs.
+    '''
+    if cls is None:
+        cls = Bug
+    if data[:1] == BUGS_MSGPACK:
+        if msgpack is None:
+            raise ValueError('msgpack is needed to decode bugs')
+        records = msgpack.unpackb(data[1:], raw=False)
+    elif data[:1] == BUGS_JSON:
+        records = json.loads(data[1:].decode('utf-8'))
+    else:
+        raise ValueError('Unknown encoding of bugs')
+    return [cls.from_record(record) for record in records]
+
+
+def create_parse_pool(processes=None):
+    '''
+    Creates process pool for parsing bugs, closed on interpreter exit.
+
+    It should be created while configuring the application, before other
+    threads are started, as the workers are forked.
+    '''
+    pool = Pool(processes)
+    atexit.register(close_pool, pool)
+    return pool
+
+
+def close_pool(pool):
+    '''
+    Closes process pool and waits for its workers.
+    '''
+    pool.close()
+    pool.join()
+
+
+def parse_bug_chunk(args):
+    '''
+    Parses list of bug XML fragments, used in process pool.
+
+    Returns list of Bug objects or BugzillaError for bugs which failed.
+    '''
+    fragments, anonymous, fields, exclude = args
+    # pylint: disable=no-member
+    parser = ElementTree.XMLParser(recover=True)
+    result = []
+    for fragment in fragments:
+        # pylint: disable=no-member
+        bug_et = ElementTree.fromstring(fragment.encode('utf-8'), parser)
+        try:
+            result.append(Bug(bug_et, anonymous, fields, exclude))
+        except BugzillaError as exc:
+            result.append(exc)
+    return result
+
+
+def copy_bugs(bugs):
+    '''
+    Returns list with copies of bugs, other items are kept.
+    '''
+    return [bug.copy() if isinstance(bug, Bug) else bug for bug in bugs]
+
+
+def get_response_text(response):
+    '''
+    Decodes response body without processing HTML entities.
+    '''
+    return (response.body or b'').decode(
+        response.charset or 'utf-8', 'replace'
+    )
+
+
+def get_form_diff(original, current):
+    '''
+    Returns dictionary of changed form fields with old and new values.
+    '''
+    diff = {}
+    for name in set(original) | set(current):
+        old = original.get(name)
+        new = current.get(name)
+        if old != new:
+            diff[name] = (old, new)
+    return diff
 
-    substrs = sorted(replacement_map, key=len, reverse=True)
-    regexp = re.compile('|'.join([re.escape(s) for s in substrs]))
-    return regexp.sub(lambda match: replacement_map[match.group(0)], data)
+
+class BugUpdate(object):
+    '''
+    Outcome of single bug update.
+    '''
+    def __init__(self, bug_id, status, changes=None, error=None, attempts=1):
+        self.bug_id = bug_id
+        self.status = status
+        self.changes = changes or {}
+        self.error = error
+        self.attempts = attempts
+
+    def __repr__(self):
+        return '<BugUpdate {0} {1}>'.format(self.bug_id, self.status)
+
+
+def get_bulk_diff(state, changes):
+    '''
+    Returns dictionary of fields which differ from requested changes.
+    '''
+    if state is None:
+        state = {}
+    diff = {}
+    for name, value in changes.items():
+        current = state.get(name)
+        if (current or '') != (value or ''):
+            diff[name] = (current, value)
+    return diff
+
+
+def get_bulk_status(before, after, changes):
+    '''
+    Verifies result of mass change, returns None if it was not applied.
+
+    Fields which are not present in bug data are considered changed when
+    delta_ts has changed.
+    '''
+    if before is None or after is None:
+        return None
+    changed = after['delta_ts'] != before['delta_ts']
+    for name, value in changes.items():
+        current = after.get(name)
+        if current is None and changed:
+            continue
+        if (current or '') != (value or ''):
+            return None
+    return UPDATE_UPDATED if changed else UPDATE_UNCHANGED
+
+
+def cookie_values(cookies):
+    '''
+    Returns comparable representation of cookies.
+    '''
+    return sorted((cookie.name, cookie.value) for cookie in cookies)
 
 
 class Bug(object):
@@ -118,7 +484,7 @@ class Bug(object):
     Class holding bug information.
     '''
 
-    def __init__(self, bug_et, anonymous=False):
+    def __init__(self, bug_et, anonymous=False, fields=None, exclude=None):
         error = bug_et.get('error')
         self.bug_id = None
         if error is not None:
@@ -141,8 +507,90 @@ class Bug(object):
         self.creation_ts = None
         self.anonymous = anonymous
         self.flags = []
+        # Fields which were requested, None means all
+        self.fields = None if fields is None else frozenset(fields)
+        # Fields which were excluded
+        self.exclude = frozenset(exclude or ())
         for element in bug_et.getchildren():
-            self.process_element(element)
+            if self.has_field(element.tag):
+                self.process_element(element)
+
+    def __reduce__(self):
+        return (restore_bug, (self.__class__, self.to_record()))
+
+    def copy(self):
+        '''
+        Returns copy of the bug not sharing lists with it.
+        '''
+        bug = self.__class__.__new__(self.__class__)
+        bug.__dict__.update(self.__dict__)
+        for name in BUG_LIST_ATTRIBUTES:
+            setattr(bug, name, list(getattr(self, name)))
+        bug.comments = [dict(comment) for comment in self.comments]
+        bug.attachments = [
+            dict(attachment) for attachment in self.attachments
+        ]
+        return bug
+
+    def to_record(self):
+        '''
+        Returns compact serializable representation of the bug.
+
+        The record contains only basic types, comments and attachments
+        are stored by columns.
+        '''
+        record = {
+            'v': BUG_RECORD_VERSION,
+            'anonymous': self.anonymous,
+            'fields': None if self.fields is None else sorted(self.fields),
+            'exclude': sorted(self.exclude),
+            'attrs': dict(
+                (name, value) for name, value in self.__dict__.items()
+                if name not in BUG_SPECIAL_ATTRIBUTES
+            ),
+            'comments': encode_columns(self.comments, COMMENT_COLUMNS),
+            'attachments': encode_columns(
+                self.attachments, ATTACHMENT_COLUMNS
+            ),
+        }
+        for name in BUG_LIST_ATTRIBUTES:
+            record[name] = getattr(self, name)
+        for name in BUG_DATE_ATTRIBUTES:
+            record[name] = encode_datetime(getattr(self, name))
+        return record
+
+    @classmethod
+    def from_record(cls, record):
+        '''
+        Creates bug from record returned by to_record.
+        '''
+        if record.get('v') != BUG_RECORD_VERSION:
+            raise ValueError(
+                'Unsupported bug record version: {0}'.format(record.get('v'))
+            )
+        bug = cls.__new__(cls)
+        bug.__dict__.update(record['attrs'])
+        bug.anonymous = record['anonymous']
+        fields = record['fields']
+        bug.fields = None if fields is None else frozenset(fields)
+        bug.exclude = frozenset(record.get('exclude', ()))
+        for name in BUG_LIST_ATTRIBUTES:
+            setattr(bug, name, list(record[name]))
+        for name in BUG_DATE_ATTRIBUTES:
+            setattr(bug, name, decode_datetime(record[name]))
+        bug.comments = decode_columns(record['comments'], COMMENT_COLUMNS)
+        bug.attachments = decode_columns(
+            record['attachments'], ATTACHMENT_COLUMNS
+        )
+        return bug
+
+    def has_field(self, name):
+        '''
+        Checks whether field was requested from bugzilla.
+        '''
+        if name in self.exclude:
+            return False
+        return self.fields is None or name in self.fields
 
     def has_nonempty(self, name):
         '''
@@ -238,17 +686,36 @@ class Bug(object):
         self.flags.append(flag)
 
 
-class Bugzilla(WebScraper):
+class Bugzilla(WebScraper, CacherMixin):
     '''
     Class for access to Novell bugzilla.
     '''
+    cache_key_template = 'bugzilla-%s'
+    # Cookies Bugzilla sets for logged in users
+    login_cookies = ('Bugzilla_login', 'Bugzilla_logincookie')
+    # Coalescing of identical concurrent requests, shared by all instances
+    coalesce = True
+    _flights = SingleFlight(copy_bugs)
+    # Window for batching get_bug calls into single request, 0 disables it
+    batch_window = 0
+    batch_size = 100
+    _batchers = {}
+    _batchers_lock = threading.Lock()
+    # Process pool for parsing large results, None disables it
+    parse_pool = None
+    parse_threshold = PARSE_THRESHOLD
 
     def __init__(self, user, password, base='https://bugzilla.novell.com',
-                 useragent=None, force_readonly=False, transport='pycurl'):
+                 useragent=None, force_readonly=False, transport='pycurl',
+                 retry_policy=None, circuit_breaker=None, session_store=None,
+                 response_cache=None, use_get=False):
         super(Bugzilla, self).__init__(
-            user, password, base, useragent, transport
+            user, password, base, useragent, transport,
+            retry_policy, circuit_breaker, response_cache, use_get
         )
         self.force_readonly = force_readonly
+        self.session_store = session_store
+        self.session_cookies = None
         self.logger = logging.getLogger('suse.bugzilla')
 
     def possible_relogin(self, error):
@@ -272,26 +739,42 @@ class Bugzilla(WebScraper):
         '''
         Performs single request on a server (loads single page).
         '''
-        try:
-            return super(Bugzilla, self).request(
-                action, paramlist, **kwargs
-            )
-        except WebScraperError as error:
-            if self.possible_relogin(error):
-                return super(Bugzilla, self).request(
-                    action, paramlist, **kwargs
-                )
-            raise error
+        return self._request_relogin(
+            super(Bugzilla, self).request, action, paramlist, kwargs
+        )
+
+    def fetch(self, action, paramlist=None, **kwargs):
+        '''
+        Performs read only request on a server.
+        '''
+        return self._request_relogin(
+            super(Bugzilla, self).fetch, action, paramlist, kwargs
+        )
 
-    def submit(self):
+    def _request_relogin(self, call, action, paramlist, kwargs):
+        '''
+        Performs request, logging in again on possible bad cookies.
         '''
-        Submits currently selected browser form.
+        with measure('bugzilla', 'request') as measurement:
+            try:
+                return call(action, paramlist, **kwargs)
+            except WebScraperError as error:
+                if self.possible_relogin(error):
+                    measurement.retries += 1
+                    return call(action, paramlist, **kwargs)
+                if getattr(error.original, 'code', None) == 401:
+                    raise BugzillaLoginFailed('Authentication failed')
+                raise error
+
+    def submit(self, form=None):
+        '''
+        Submits currently selected browser form or given HTMLForm.
         '''
         try:
-            return super(Bugzilla, self).submit()
+            return super(Bugzilla, self).submit(form)
         except WebScraperError as error:
             if self.possible_relogin(error):
-                return super(Bugzilla, self).submit()
+                return super(Bugzilla, self).submit(form)
             raise error
 
     def check_viewing_html(self):
@@ -328,11 +811,83 @@ class Bugzilla(WebScraper):
             return True
         return False
 
-    # pylint: disable=W0613
+    def get_session_key(self):
+        '''
+        Returns key identifying login session in session store.
+        '''
+        key = '{0}|{1}'.format(self.base, self.user)
+        return 'bugzilla-session-{0}'.format(
+            hashlib.md5(key.encode('utf-8')).hexdigest()
+        )
+
     def login(self, force=False):
+        '''
+        Login to Bugzilla, reusing session from session store if available.
+        '''
+        if self.session_store is None:
+            self._login(force)
+            return
+        key = self.get_session_key()
+        if not force:
+            cookies = self.session_store.get(key)
+            if cookies is not None:
+                self.set_session_cookies(cookies)
+                return
+        with self.session_store.lock(key):
+            # Other process might have logged in while we were waiting,
+            # when forced, reuse only session different from the one we had
+            cookies = self.session_store.get(key)
+            if cookies is not None and (
+                    not force or
+                    (self.session_cookies is not None and
+                     cookie_values(cookies) != self.session_cookies)):
+                self.set_session_cookies(cookies)
+                return
+            self._login(force)
+            cookies = self.get_cookies()
+            self.session_cookies = cookie_values(cookies)
+            self.session_store.set(key, cookies)
+
+    def set_session_cookies(self, cookies):
+        '''
+        Sets cookies from session store.
+        '''
+        self.set_cookies(cookies)
+        self.session_cookies = cookie_values(cookies)
+
+    def probe_login(self):
+        '''
+        Checks whether we have login cookies without loading any page.
+        '''
+        host = urlparse(self.base).hostname or ''
+        found = set()
+        for cookie in self.get_cookies():
+            if (cookie.name in self.login_cookies and
+                    cookie.value and
+                    not cookie.is_expired() and
+                    host.endswith(cookie.domain.lstrip('.'))):
+                found.add(cookie.name)
+        return len(found) == len(self.login_cookies)
+
+    def clear_login_cookies(self):
+        '''
+        Removes login cookies from the browser.
+        '''
+        jar = self.browser.cookies.cookiejar
+        for cookie in list(jar):
+            if cookie.name in self.login_cookies:
+                jar.clear(cookie.domain, cookie.path, cookie.name)
+
+    def _login(self, force=False):
         '''
         Login to Bugzilla using Access Manager.
         '''
+        if not force and self.probe_login():
+            self.logger.info('Already logged in')
+            return
+        if force:
+            # Stale login cookies would make probe_login pass
+            self.clear_login_cookies()
         if self.check_login():
             return
 
@@ -373,7 +928,7 @@ class Bugzilla(WebScraper):
                     )
                     self.request(newpath)
 
-        if not self.check_login():
+        if not self.probe_login() and not self.check_login():
             raise BugzillaLoginFailed(
                 'Failed to verify login after successful login'
             )
@@ -417,33 +972,121 @@ class Bugzilla(WebScraper):
                 traceback.format_exc()
             )
 
-    def get_bug(self, bugid, retry=True):
+    def get_bug(self, bugid, retry=True, fields=None, exclude=None):
         '''
         Returns Bug object based on data received from bugzilla.
 
         Returns None in case of failure.
         '''
-        result = self.get_bugs([bugid], retry)
+        if fields is not None or exclude is not None:
+            result = self.get_bugs([bugid], retry, fields=fields,
+                                   exclude=exclude)
+        elif self.batch_window and bugid is not None:
+            return self._get_batcher().submit(
+                str(bugid), lambda ids: self._get_bugs_batch(ids, retry)
+            )
+        else:
+            result = self.get_bugs([bugid], retry)
         if result:
             return result[0]
         return None
 
-    def get_bugs(self, ids, retry=True, permissive=False, store_errors=False):
+    def _get_batcher(self):
+        '''
+        Returns batcher shared by instances accessing same server as user.
+        '''
+        key = (self.base, self.user)
+        with self._batchers_lock:
+            if key not in self._batchers:
+                self._batchers[key] = MicroBatcher(
+                    self.batch_window, self.batch_size
+                )
+            return self._batchers[key]
+
+    def _get_bugs_batch(self, ids, retry):
+        '''
+        Fetches batch of bugs and returns dictionary indexed by bug ID.
+        '''
+        result = {}
+        for bug in self.get_bugs(ids, retry, True, True):
+            result[bug.bug_id] = bug
+        return result
+
+    def get_bugs(self, ids, retry=True, permissive=False, store_errors=False,
+                 fields=None, exclude=None):
         '''
         Returns Bug objects based on data received from bugzilla for each bug
         ID.
 
+        Only fields listed in fields are fetched when given, fields listed
+        in exclude are never fetched.
+
         Returns empty list in case of some problems.
         '''
+        ids = list(ids)
+        if fields is not None:
+            fields = tuple(sorted(set(fields) | BUG_REQUIRED_FIELDS))
+        exclude = tuple(sorted(
+            (set(exclude or ()) | BUG_EXCLUDED_FIELDS) - BUG_REQUIRED_FIELDS
+        ))
+        if not self.coalesce:
+            return self._get_bugs(
+                ids, retry, permissive, store_errors, fields, exclude
+            )
+        key = (
+            'show_bug', self.base, self.user, tuple(ids),
+            retry, permissive, store_errors, fields, exclude
+        )
+        return list(self._flights.do(
+            key, self._get_bugs,
+            ids, retry, permissive, store_errors, fields, exclude
+        ))
+
+    def _get_bugs(self, ids, retry, permissive, store_errors, fields,
+                  exclude):
+        '''
+        Fetches bugs from bugzilla.
+        '''
         # Generate request query
         req = [('id', bugid) for bugid in ids if bugid is not None]
-        req += [('ctype', 'xml'), ('excludefield', 'attachmentdata')]
+        req.append(('ctype', 'xml'))
+        if fields is not None:
+            req += [('includefield', field) for field in fields]
+        req += [('excludefield', field) for field in exclude]
 
         # Download data
-        data = self.request('show_bug', paramlist=req)
+        data = self.fetch('show_bug', paramlist=req)
 
+        try:
+            with measure('bugzilla', 'parse_bugs') as measurement:
+                measurement.bytes = len(data.body or b'')
+                return self._parse_bugs(
+                    data.unicode_body(), ids, permissive, store_errors, fields,
+                    exclude
+                )
+        except BugzillaNotPermitted as exc:
+            if retry and not self.anonymous:
+                self.logger.error("%s - login and retry", exc)
+                self.login(force=True)
+                return self._get_bugs(
+                    ids, False, permissive, store_errors, fields, exclude
+                )
+            raise exc
+
+    def _parse_bugs(self, data, ids, permissive, store_errors, fields=None,
+                    exclude=None):
+        '''
+        Parses XML with bugs into list of Bug objects.
+        '''
         # Fixup XML errors bugzilla produces
-        data = escape_xml_text(data.unicode_body())
+        data = escape_xml_text(data)
+
+        if (self.parse_pool is not None and
+                data.count('</bug>') >= self.parse_threshold):
+            return self._parse_bugs_parallel(
+                BUG_FRAGMENT_RE.findall(data), permissive, store_errors,
+                fields, exclude
+            )
 
         # Parse XML
         try:
@@ -457,52 +1100,230 @@ class Bugzilla(WebScraper):
                 data
             )
             return []
-        try:
-            bugs = []
-            for bug in response_et.findall('bug'):
-                try:
-                    bugs.append(Bug(bug, self.anonymous))
-                except BugzillaError as exc:
-                    if store_errors:
-                        bugs.append(exc)
-                    if permissive:
-                        self.logger.error(exc)
-                    else:
-                        raise exc
-            return bugs
-        except BugzillaNotPermitted as exc:
-            if retry and not self.anonymous:
-                self.logger.error("%s - login and retry", exc)
-                self.login()
-                return self.get_bugs(ids, False, permissive)
-            raise exc
+        bugs = []
+        for bug in response_et.findall('bug'):
+            try:
+                bugs.append(Bug(bug, self.anonymous, fields, exclude))
+            except BugzillaError as exc:
+                if store_errors:
+                    bugs.append(exc)
+                if permissive:
+                    self.logger.error(exc)
+                else:
+                    raise exc
+        return bugs
+
+    def _parse_bugs_parallel(self, fragments, permissive, store_errors,
+                             fields, exclude=None):
+        '''
+        Parses bug XML fragments in process pool.
+        '''
+        chunks = [
+            (fragments[pos:pos + PARSE_CHUNK], self.anonymous, fields,
+             exclude)
+            for pos in range(0, len(fragments), PARSE_CHUNK)
+        ]
+        bugs = []
+        for result in self.parse_pool.map(parse_bug_chunk, chunks):
+            for bug in result:
+                if not isinstance(bug, BugzillaError):
+                    bugs.append(bug)
+                    continue
+                if store_errors:
+                    bugs.append(bug)
+                if permissive:
+                    self.logger.error(bug)
+                else:
+                    raise bug
+        return bugs
 
     def do_search(self, params):
         '''
         Performs search and returns list of IDs.
         '''
-        req = [('ctype', 'atom')] + params
+        if not self.coalesce:
+            return self._do_search(params)
+        key = ('buglist', self.base, self.user, tuple(params))
+        return list(self._flights.do(key, self._do_search, params))
+
+    def _do_search(self, params):
+        '''
+        Performs search on bugzilla.
+        '''
+        return list(self.iter_search(params))
+
+    def iter_search(self, params, page_size=None):
+        '''
+        Performs search and yields IDs as they are parsed.
+
+        With page_size the search is split into several requests using
+        limit and offset.
+        '''
+        if not page_size:
+            for bugid in self._iter_search_page(params):
+                yield bugid
+            return
+        params = list(params)
+        if not any(name == 'order' for name, dummy in params):
+            params.append(('order', 'bug_id'))
+        offset = 0
+        while True:
+            count = 0
+            page = params + [('limit', page_size), ('offset', offset)]
+            for bugid in self._iter_search_page(page):
+                count += 1
+                yield bugid
+            if count < page_size:
+                return
+            offset += page_size
+
+    def _iter_search_page(self, params):
+        '''
+        Performs single search request and yields IDs from the Atom feed.
+        '''
+        req = [('ctype', 'atom')] + list(params)
         self.logger.info('Doing bugzilla search: %s', req)
-        response = self.request('buglist', paramlist=req)
-        data = escape_xml_text(response.unicode_body())
+        response = self.fetch('buglist', paramlist=req)
+        measurement = Measurement('bugzilla', 'parse_search')
+        measurement.bytes = len(response.body or b'')
+        data = get_response_text(response)
+        # pylint: disable=no-member
+        parser = ElementTree.XMLPullParser(
+            events=('end',), tag=ATOM_ENTRY, recover=True
+        )
         try:
-            # pylint: disable=no-member
-            parser = ElementTree.XMLParser(recover=True)
-            # pylint: disable=no-member
-            response_et = ElementTree.fromstring(data.encode('utf-8'), parser)
-        except SyntaxError:
-            self._handle_parse_error('recent', data)
-            return []
-
-        id_query = '{http://www.w3.org/2005/Atom}id'
-        entry_query = '{http://www.w3.org/2005/Atom}entry'
+            for pos in range(0, len(data), SEARCH_CHUNK):
+                start = default_timer()
+                try:
+                    parser.feed(escape_xml_text(
+                        data[pos:pos + SEARCH_CHUNK]
+                    ).encode('utf-8'))
+                    bugs = self._read_search_events(parser)
+                finally:
+                    measurement.duration += default_timer() - start
+                for bugid in bugs:
+                    yield bugid
+            parser.close()
+        except SyntaxError as error:
+            measurement.error = error
+            self._handle_parse_error('recent', escape_xml_text(data))
+        finally:
+            if HOOKS:
+                emit(measurement)
+
+    @staticmethod
+    def _read_search_events(parser):
+        '''
+        Returns IDs of parsed Atom entries and frees them from memory.
+        '''
+        bugs = []
+        for dummy, entry in parser.read_events():
+            bugid = entry.findtext(ATOM_ID)
+            entry.clear()
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+            if bugid:
+                # Strip http://bugzilla.novell.com/show_bug.cgi?id=
+                bugs.append(int(bugid[bugid.find("?id=") + 4:]))
+        return bugs
+
+    def search_bugs(self, params, chunk_size=SEARCH_FETCH_CHUNK,
+                    workers=SEARCH_FETCH_WORKERS, page_size=None,
+                    permissive=False):
+        '''
+        Performs search and yields Bug objects for matching bugs.
 
-        bugs = [
-            bug.find(id_query).text for bug in response_et.findall(entry_query)
-        ]
+        IDs are streamed from the search into bounded queue and fetched in
+        chunks by concurrent workers, bugs are yielded in order in which
+        the chunks are completed.
+        '''
+        tasks = queue.Queue(workers * 2)
+        results = queue.Queue(workers * 2)
+        stop = threading.Event()
+
+        def put(target, item):
+            '''
+            Puts item into queue unless the pipeline is stopped.
+            '''
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def take():
+            '''
+            Takes chunk from queue, returns None when the pipeline is done.
+            '''
+            while not stop.is_set():
+                try:
+                    return tasks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return None
+
+        def feed(bugzilla):
+            '''
+            Splits search results into chunks.
+            '''
+            try:
+                chunk = []
+                for bugid in bugzilla.iter_search(params, page_size):
+                    chunk.append(bugid)
+                    if len(chunk) >= chunk_size:
+                        if not put(tasks, chunk):
+                            return
+                        chunk = []
+                if chunk:
+                    put(tasks, chunk)
+            except Exception as error:  # pylint: disable=broad-except
+                put(results, error)
+            finally:
+                for dummy in range(workers):
+                    put(tasks, None)
+
+        def fetch(bugzilla):
+            '''
+            Fetches chunks of bugs.
+            '''
+            try:
+                chunk = take()
+                while chunk is not None:
+                    put(results, bugzilla.get_bugs(
+                        chunk, permissive=permissive
+                    ))
+                    chunk = take()
+            except Exception as error:  # pylint: disable=broad-except
+                put(results, error)
+            finally:
+                put(results, None)
+
+        threads = [threading.Thread(target=feed, args=(self.clone(),))]
+        threads.extend([
+            threading.Thread(target=fetch, args=(self.clone(),))
+            for dummy in range(workers)
+        ])
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
 
-        # Strip http://bugzilla.novell.com/show_bug.cgi?id=
-        return [int(bugid[bugid.find("?id=") + 4:]) for bugid in bugs]
+        try:
+            running = workers
+            while running:
+                result = results.get()
+                if result is None:
+                    running -= 1
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    for bug in result:
+                        yield bug
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
 
     def get_recent_bugs(self, startdate):
         '''
@@ -571,34 +1392,166 @@ class Bugzilla(WebScraper):
         '''
         Black magic to obtain SR ids from bugzilla.
         '''
-        # Load the form
+        # Load the page
         self.logger.info('Loading bug page for %d', bugid)
-        self.request('show_bug', id=bugid)
+        response = self.request('show_bug', id=bugid)
 
         self.check_viewing_html()
 
-        # Find link containing SR ids
-        link = self.browser.doc.select(
-            "//a[text()='Report View']"
-        ).selector_list
-        if not link:
+        # Find link containing SR ids, the page is only scanned as it can
+        # be huge for bugs with long history
+        with measure('bugzilla', 'parse_sr'):
+            match = SR_LINK_MATCH.search(get_response_text(response))
+        if match is None:
             return []
+        return parse_sr_link(match.group(1))
+
+    def get_new_comments(self, comments):
+        '''
+        Fetches comments added after already known ones.
 
-        # Split parts (URL encoded)
-        urlpart = [x for x in link.url.split('%26') if x[:7] == 'lsMSRID']
+        The comments is dictionary of bug ids and lists of known comments,
+        returns dictionary of bug ids and lists of new comments.
+        '''
+        since = min([
+            to_utc(known[-1]['bug_when']) for known in comments.values()
+        ]) - timedelta(seconds=COMMENT_SYNC_OVERLAP)
+        params = [{
+            'ids': sorted(comments),
+            'new_since': since.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }]
+        url = '{0}?{1}'.format(
+            self._get_req_url('jsonrpc'),
+            urlencode([
+                ('method', 'Bug.comments'),
+                ('params', json.dumps(params)),
+            ])
+        )
+        response = self.request(url)
+        data = json.loads(get_response_text(response))
+        if data.get('error'):
+            raise BugzillaError(data['error'].get('message'))
+        bugs = data['result']['bugs']
+        result = {}
+        for bugid, known in comments.items():
+            last = to_utc(known[-1]['bug_when'])
+            result[bugid] = [
+                parse_rpc_comment(comment)
+                for comment in bugs[str(bugid)]['comments']
+                if ('count' in comment and comment['count'] >= len(known)) or
+                ('count' not in comment and
+                 to_utc(dateutil.parser.parse(comment['time'])) > last)
+            ]
+        return result
+
+    def refresh_bugs(self, bugs, permissive=False):
+        '''
+        Refreshes previously fetched bugs.
 
-        if not urlpart:
+        Bugs are fetched without comments and unchanged bugs are returned
+        as they are. Only new comments are fetched for changed bugs and
+        appended to the known ones, full bugs are fetched when this fails.
+        '''
+        cached = dict((int(bug.bug_id), bug) for bug in bugs)
+        if not cached:
             return []
+        fresh = self.get_bugs(
+            list(cached), permissive=permissive, exclude=('long_desc',)
+        )
+        result = {}
+        changed = {}
+        full = []
+        for bug in fresh:
+            bugid = int(bug.bug_id)
+            old = cached[bugid]
+            if bug.delta_ts == old.delta_ts:
+                result[bugid] = old
+            elif old.comments and old.comments[-1]['bug_when'] is not None:
+                changed[bugid] = bug
+            else:
+                full.append(bugid)
 
-        # Find SR ids
-        match = SR_MATCH.findall(urlpart[0])
+        if changed:
+            try:
+                comments = self.get_new_comments(
+                    dict((bugid, cached[bugid].comments) for bugid in changed)
+                )
+                for bugid, bug in changed.items():
+                    bug = bug.copy()
+                    bug.comments = cached[bugid].comments + comments[bugid]
+                    bug.exclude = bug.exclude - set(('long_desc',))
+                    result[bugid] = bug
+            except (WebScraperError, ValueError, KeyError, TypeError) as exc:
+                self.logger.warning(
+                    'Failed to fetch new comments, fetching bugs: %s', exc
+                )
+                full.extend(changed)
 
-        # Convert to integers
-        return [int(x) for x in match]
+        if full:
+            for bug in self.get_bugs(full, permissive=permissive):
+                result[int(bug.bug_id)] = bug
 
-    def load_update_form(self, bugid):
+        return [
+            result[int(bug.bug_id)] for bug in fresh
+            if int(bug.bug_id) in result
+        ]
+
+    def get_srs(self, bug_ids, workers=SR_WORKERS):
+        '''
+        Returns dictionary with SR ids for each bug.
+
+        Results are cached per bug and reused until bug delta_ts changes,
+        bug pages are loaded concurrently only for changed bugs.
+        '''
+        bug_ids = [int(bugid) for bugid in bug_ids]
+        if not bug_ids:
+            return {}
+        stamps = dict(
+            (int(bug.bug_id), bug.delta_ts)
+            for bug in self.get_bugs(
+                bug_ids, permissive=True, fields=('delta_ts',)
+            )
+        )
+        result = {}
+        pending = []
+        for bugid in bug_ids:
+            cached = self.cache_get('sr-{0}'.format(bugid), force=True)
+            if (cached is not None and stamps.get(bugid) is not None and
+                    cached[0] == stamps[bugid]):
+                result[bugid] = cached[1]
+            elif bugid not in pending:
+                pending.append(bugid)
+        if not pending:
+            return result
+
+        local = threading.local()
+
+        def fetch(bugid):
+            '''
+            Fetches SR ids using thread local session.
+            '''
+            if not hasattr(local, 'bugzilla'):
+                local.bugzilla = self.clone()
+            return local.bugzilla.get_sr(bugid)
+
+        pool = ThreadPool(min(workers, len(pending)))
+        try:
+            srs = pool.map(fetch, pending)
+        finally:
+            pool.close()
+            pool.join()
+
+        for bugid, value in zip(pending, srs):
+            result[bugid] = value
+            if stamps.get(bugid) is not None:
+                self.cache_set(
+                    'sr-{0}'.format(bugid), (stamps[bugid], value)
+                )
+        return result
+
+    def _load_update_page(self, bugid):
         """
-        Selects form for bug update.
+        Loads page with bug update form.
         """
         if self.anonymous:
             raise BugzillaUpdateError('No updates in anonymous mode!')
@@ -606,13 +1559,35 @@ class Bugzilla(WebScraper):
         # Load the form
         self.logger.info('Loading bug form for %d', bugid)
         response = self.request('show_bug', id=bugid)
-        data = response.unicode_body()
+        data = get_response_text(response)
         if 'You are not authorized to access bug' in data:
             raise BugzillaNotPermitted(
                 'You are not authorized to access bug #%d.' % bugid
             )
 
         self.check_viewing_html()
+        return response, data
+
+    def load_update_fields(self, bugid):
+        """
+        Returns HTMLForm with fields of bug update form.
+
+        Only the change form without comments is parsed.
+        """
+        response, data = self._load_update_page(bugid)
+        with measure('bugzilla', 'parse_form'):
+            form = extract_form(
+                data, 'changeform', response.url, BUG_COMMENTS_RE
+            )
+        if form is None:
+            raise BugzillaUpdateError('Failed to parse HTML to update bug!')
+        return form
+
+    def load_update_form(self, bugid):
+        """
+        Selects form for bug update.
+        """
+        self._load_update_page(bugid)
 
         # Find the form
         try:
@@ -625,8 +1600,29 @@ class Bugzilla(WebScraper):
                    whiteboard_add=None, whiteboard_remove=None, **kwargs):
         '''
         Updates bugzilla.
+
+        Returns dictionary with changed form fields and their old and new
+        values.
         '''
-        self.load_update_form(bugid)
+        return self._update_bug(
+            bugid, callback, callback_param, whiteboard_add,
+            whiteboard_remove, kwargs
+        )[1]
+
+    def _update_bug(self, bugid, callback, callback_param, whiteboard_add,
+                    whiteboard_remove, kwargs):
+        '''
+        Updates bugzilla, returns update status and changes.
+
+        Without callback only the change form is parsed, the callback
+        gets browser with full document.
+        '''
+        if callback is None:
+            form = self.load_update_fields(bugid)
+        else:
+            self.load_update_form(bugid)
+            form = self.browser.doc
+        original = dict(form.form_fields())
 
         changes = False
 
@@ -638,10 +1634,11 @@ class Bugzilla(WebScraper):
         # Set parameters
         for k in kwargs:
             val = kwargs[k]
-            if isinstance(val, text_type):
+            # Grab expects native strings, encode unicode on Python 2
+            if not isinstance(val, str) and isinstance(val, text_type):
                 val = val.encode('utf-8')
             try:
-                self.browser.doc.set_input(k, val)
+                form.set_input(k, val)
             except DataNotFound:
                 if k not in IGNORABLE_FIELDS:
                     raise
@@ -654,29 +1651,209 @@ class Bugzilla(WebScraper):
         # Whiteboard manipulations
         if whiteboard_add is not None or whiteboard_remove is not None:
             changes |= self._update_bug_whiteboard(
+                form,
+                form.form_fields(),
                 whiteboard_remove,
                 whiteboard_add
             )
 
+        diff = get_form_diff(original, form.form_fields())
+
         # Retrun on no changes
-        if not changes or self.force_readonly:
-            return
+        if not changes:
+            return UPDATE_UNCHANGED, diff
+        if self.force_readonly:
+            return UPDATE_DRY_RUN, diff
 
         # Submit
+        response = self.submit(None if form is self.browser.doc else form)
+        data = response.unicode_body()
+        if 'Mid-air collision!' in data:
+            raise BugzillaMidAirCollision('Mid-air collision!', bugid)
+        if 'reason=invalid_token' in data:
+            raise BugzillaUpdateError('Suspicious Action')
+        if 'Changes submitted for' not in data:
+            raise BugzillaUpdateError('Unknown error while submitting form')
+        return UPDATE_UPDATED, diff
+
+    def update_bugs(self, updates, workers=UPDATE_WORKERS,
+                    collision_retries=UPDATE_COLLISION_RETRIES):
+        '''
+        Updates several bugs concurrently.
+
+        The updates is a list of tuples containing bug ID and dictionary
+        with keyword arguments for update_bug. Returns list of BugUpdate
+        objects in the same order.
+        '''
+        updates = list(updates)
+        if not updates:
+            return []
+        local = threading.local()
+
+        def update(item):
+            '''
+            Performs single update using thread local session.
+            '''
+            if not hasattr(local, 'bugzilla'):
+                local.bugzilla = self.clone()
+            return local.bugzilla._update_bug_safe(
+                item[0], dict(item[1]), collision_retries
+            )
+
+        pool = ThreadPool(min(workers, len(updates)))
+        try:
+            return pool.map(update, updates)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _update_bug_safe(self, bugid, kwargs, collision_retries):
+        '''
+        Updates bug, retrying on mid-air collision, returns BugUpdate.
+        '''
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                status, diff = self._update_bug(
+                    bugid,
+                    kwargs.get('callback'),
+                    kwargs.get('callback_param'),
+                    kwargs.get('whiteboard_add'),
+                    kwargs.get('whiteboard_remove'),
+                    dict(
+                        (key, value) for key, value in kwargs.items()
+                        if key not in UPDATE_ARGUMENTS
+                    )
+                )
+                return BugUpdate(bugid, status, diff, attempts=attempt)
+            except BugzillaMidAirCollision as error:
+                if attempt <= collision_retries:
+                    self.logger.warning(
+                        'Mid-air collision on bug %s, retrying', bugid
+                    )
+                    continue
+                return BugUpdate(bugid, UPDATE_FAILED, error=error,
+                                 attempts=attempt)
+            except (WebScraperError, DataNotFound) as error:
+                self.logger.error('Failed to update bug %s: %s', bugid, error)
+                return BugUpdate(bugid, UPDATE_FAILED, error=error,
+                                 attempts=attempt)
+
+    def bulk_update(self, bug_ids, chunk_size=BULK_CHUNK, **changes):
+        '''
+        Sets same field values on several bugs using mass change form.
+
+        Bugs which were not updated by the mass change are updated one by
+        one. Returns list of BugUpdate objects in the same order as bug_ids.
+
+        Setting status_whiteboard replaces whole whiteboard of every bug,
+        whiteboard_add, whiteboard_remove and callback are applied to each
+        bug separately as they depend on its current values.
+        '''
+        original = list(bug_ids)
+        bug_ids = [str(bugid) for bugid in original]
+        if self.anonymous:
+            raise BugzillaUpdateError('No updates in anonymous mode!')
+        if UPDATE_ARGUMENTS.intersection(changes):
+            return [
+                self._bulk_update_bug(orig, bugid, changes)
+                for orig, bugid in zip(original, bug_ids)
+            ]
+        before = self._get_bulk_state(bug_ids, changes)
+
+        if self.force_readonly:
+            return [
+                BugUpdate(
+                    orig, UPDATE_DRY_RUN,
+                    get_bulk_diff(before.get(bugid), changes)
+                )
+                for orig, bugid in zip(original, bug_ids)
+            ]
+
+        for pos in range(0, len(bug_ids), chunk_size):
+            chunk = bug_ids[pos:pos + chunk_size]
+            try:
+                self._bulk_update_chunk(chunk, changes)
+            except (WebScraperError, DataNotFound) as error:
+                self.logger.error(
+                    'Mass change of bugs %s failed: %s', ','.join(chunk), error
+                )
+
+        # Verify the changes, falling back to single bug updates
+        after = self._get_bulk_state(bug_ids, changes)
+        result = []
+        for orig, bugid in zip(original, bug_ids):
+            status = get_bulk_status(
+                before.get(bugid), after.get(bugid), changes
+            )
+            if status is not None:
+                result.append(BugUpdate(
+                    orig, status, get_bulk_diff(before.get(bugid), changes)
+                ))
+                continue
+            self.logger.warning(
+                'Mass change of bug %s not applied, updating it alone', bugid
+            )
+            result.append(self._bulk_update_bug(orig, bugid, changes))
+        return result
+
+    def _bulk_update_bug(self, orig, bugid, changes):
+        '''
+        Updates single bug from bulk update, returns BugUpdate.
+        '''
+        update = self._update_bug_safe(
+            int(bugid), dict(changes), UPDATE_COLLISION_RETRIES
+        )
+        update.bug_id = orig
+        return update
+
+    def _get_bulk_state(self, bug_ids, changes):
+        '''
+        Returns dictionary with delta_ts and changed fields for bugs.
+        '''
+        fields = set(changes) | set(('delta_ts',))
+        state = {}
+        for bug in self.get_bugs(bug_ids, permissive=True, fields=fields):
+            state[bug.bug_id] = dict(
+                (field, getattr(bug, field, None)) for field in fields
+            )
+        return state
+
+    def _bulk_update_chunk(self, bug_ids, changes):
+        '''
+        Submits mass change form for list of bugs.
+        '''
+        self.logger.info('Loading mass change form for %s', bug_ids)
+        self.request('buglist', bug_id=','.join(bug_ids), tweak=1)
+        self.check_viewing_html()
+        try:
+            # pylint: disable=E1102
+            self.browser.doc.choose_form(xpath="//form[@name='changeform']")
+            for bugid in bug_ids:
+                self.browser.doc.set_input('id_{0}'.format(bugid), True)
+            for name, value in changes.items():
+                self.browser.doc.set_input(name, value)
+        except (DataNotFound, KeyError):
+            # Grab raises KeyError for fields missing in the form
+            raise BugzillaUpdateError('Failed to parse HTML for mass change!')
+
         response = self.submit()
-        data = webscraper_safely(response.read)
+        data = response.unicode_body()
         if 'Mid-air collision!' in data:
-            raise BugzillaUpdateError('Mid-air collision!')
+            raise BugzillaMidAirCollision('Mid-air collision!')
         if 'reason=invalid_token' in data:
             raise BugzillaUpdateError('Suspicious Action')
         if 'Changes submitted for' not in data:
             raise BugzillaUpdateError('Unknown error while submitting form')
 
-    def _update_bug_whiteboard(self, remove, add):
+    @staticmethod
+    def _update_bug_whiteboard(form, fields, remove, add):
         '''
-        Callback for changing bug whiteboard.
+        Changes bug whiteboard, fields is cached form field map.
         '''
-        whiteboard = self.browser.doc.form_fields()['status_whiteboard']
+        current_wb = fields['status_whiteboard']
+        whiteboard = current_wb
 
         if remove is not None and remove in whiteboard:
             whiteboard = whiteboard.replace(remove, '')
@@ -684,10 +1861,9 @@ class Bugzilla(WebScraper):
         if add is not None and add not in whiteboard:
             whiteboard = '%s %s' % (whiteboard, add)
 
-        current_wb = self.browser.doc.form_fields()['status_whiteboard']
         changes = (current_wb != whiteboard)
 
-        self.browser.doc.set_input('status_whiteboard', whiteboard)
+        form.set_input('status_whiteboard', whiteboard)
 
         return changes
 
@@ -698,9 +1874,14 @@ class APIBugzilla(Bugzilla):
     '''
 
     def __init__(self, user, password, base='https://apibugzilla.suse.com',
-                 useragent=None, force_readonly=False, transport='pycurl'):
+                 useragent=None, force_readonly=False, transport='pycurl',
+                 retry_policy=None, circuit_breaker=None, session_store=None,
+                 response_cache=None, use_get=False):
         super(APIBugzilla, self).__init__(
-            user, password, base, useragent, transport=transport
+            user, password, base, useragent, transport=transport,
+            retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+            session_store=session_store, response_cache=response_cache,
+            use_get=use_get
         )
         self.force_readonly = force_readonly
         # Use normal Bugzilla for anonymous access
@@ -712,10 +1893,16 @@ class APIBugzilla(Bugzilla):
                                                    password=password)
             )
 
-    def login(self, force=False):
+    def _login(self, force=False):
         '''
         Checks login to Bugzilla using HTTP authentication.
+
+        As the authentication is sent with every request, the check is
+        done only when forced, failures are otherwise reported by the
+        first real request.
         '''
+        if not force:
+            return
         self.logger.info('Getting login page')
         self.request('index', GoAheadAndLogIn=1)
 
@@ -723,7 +1910,7 @@ class APIBugzilla(Bugzilla):
             raise BugzillaLoginFailed('Failed to login to bugzilla')
 
 
-class DjangoBugzilla(APIBugzilla):
+class DjangoBugzilla(APIBugzilla, DjangoCacherMixin):
     '''
     Adds Django specific things to bugzilla class.
     '''
@@ -741,21 +1928,16 @@ class DjangoBugzilla(APIBugzilla):
         mail_admins(subject, message, fail_silently=True)
         super(DjangoBugzilla, self).log_parse_error(bugid, data)
 
-    def login(self, force=False):
+    def __init__(self, *args, **kwargs):
+        if kwargs.get('session_store') is None:
+            kwargs['session_store'] = DjangoSessionStore()
+        super(DjangoBugzilla, self).__init__(*args, **kwargs)
+
+    def get_session_key(self):
         """
-        Login with caching cookies in Django.
+        Uses fixed key for cookies in Django cache.
         """
-        from django.core.cache import cache
-        if force:
-            cookies = None
-        else:
-            cookies = cache.get('bugzilla-access-cookies')
-
-        if cookies is None:
-            super(DjangoBugzilla, self).login(force)
-            cache.set('bugzilla-access-cookies', self.get_cookies())
-        else:
-            self.set_cookies(cookies)
+        return 'bugzilla-access-cookies'
 
 
 def get_django_bugzilla(transport='pycurl'):
@@ -768,12 +1950,16 @@ def get_django_bugzilla(transport='pycurl'):
         hasattr(settings, 'BUGZILLA_FORCE_READONLY') and
         settings.BUGZILLA_FORCE_READONLY
     )
+    retries = getattr(settings, 'BUGZILLA_RETRIES', 0)
     bugzilla = DjangoBugzilla(
         settings.BUGZILLA_USERNAME,
         settings.BUGZILLA_PASSWORD,
         useragent=settings.EMAIL_SUBJECT_PREFIX.strip('[] '),
         force_readonly=force_readonly,
-        transport=transport
+        transport=transport,
+        retry_policy=RetryPolicy(retries) if retries else None,
+        circuit_breaker=getattr(settings, 'BUGZILLA_CIRCUIT_BREAKER', False),
+        use_get=getattr(settings, 'BUGZILLA_USE_GET', False),
     )
 
     # Check for anonymous access
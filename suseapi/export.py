@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Columnar export of Bugzilla bugs.
+
+Bugs are converted in batches to columns for bugs, comments, attachments
+and flags tables, which can be written to CSV or Parquet files. Only the
+current batch is kept in memory, so bugs can be exported from a stream.
+'''
+from collections import OrderedDict
+import csv
+import io
+import os
+
+import six
+from dateutil.tz import tzutc
+
+from suseapi.bugzilla import ATTACHMENT_COLUMNS, BUG_DATE_ATTRIBUTES
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Number of bugs converted at once
+EXPORT_BATCH = 1000
+
+# Bug fields exported by default
+BUG_EXPORT_FIELDS = (
+    'bug_id', 'short_desc', 'classification', 'product', 'component',
+    'version', 'rep_platform', 'op_sys', 'bug_status', 'resolution',
+    'priority', 'bug_severity', 'assigned_to', 'reporter', 'qa_contact',
+    'status_whiteboard', 'creation_ts', 'delta_ts',
+)
+
+# Columns of dependent tables with their types
+COMMENT_EXPORT_COLUMNS = (
+    ('bug_id', 'int'),
+    ('index', 'int'),
+    ('who', 'string'),
+    ('bug_when', 'timestamp'),
+    ('private', 'bool'),
+    ('thetext', 'string'),
+)
+ATTACHMENT_TYPES = {
+    'attachid': 'int',
+    'date': 'timestamp',
+    'size': 'int',
+    'ispatch': 'bool',
+    'isobsolete': 'bool',
+}
+ATTACHMENT_EXPORT_COLUMNS = (('bug_id', 'int'),) + tuple(
+    (name, ATTACHMENT_TYPES.get(name, 'string'))
+    for name in ATTACHMENT_COLUMNS
+)
+FLAG_EXPORT_COLUMNS = (('bug_id', 'int'),) + tuple(
+    (name, 'string')
+    for name in ('name', 'id', 'type_id', 'status', 'setter', 'requestee')
+)
+
+EXPORT_TABLES = ('bugs', 'comments', 'attachments', 'flags')
+
+
+def convert_value(value, kind):
+    '''
+    Converts value to given column type.
+    '''
+    if value is None or value == '':
+        return None
+    if kind == 'int':
+        return int(value)
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'timestamp':
+        # Store timestamps as naive UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(tzutc()).replace(tzinfo=None)
+        return value
+    if isinstance(value, (list, tuple)):
+        return ','.join(value)
+    return value
+
+
+class BugExporter(object):
+    '''
+    Base class for columnar bug exporters.
+
+    Subclasses implement write_batch to store converted columns.
+    '''
+    def __init__(self, fields=BUG_EXPORT_FIELDS, batch_size=EXPORT_BATCH):
+        self.columns = OrderedDict((
+            ('bugs', tuple(
+                (
+                    name,
+                    'int' if name == 'bug_id' else
+                    'timestamp' if name in BUG_DATE_ATTRIBUTES else
+                    'string'
+                )
+                for name in fields
+            )),
+            ('comments', COMMENT_EXPORT_COLUMNS),
+            ('attachments', ATTACHMENT_EXPORT_COLUMNS),
+            ('flags', FLAG_EXPORT_COLUMNS),
+        ))
+        self.batch_size = batch_size
+        self.pending = 0
+        self.count = 0
+        self.batch = self.new_batch()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def new_batch(self):
+        '''
+        Returns empty columns for all tables.
+        '''
+        return dict(
+            (table, OrderedDict((name, []) for name, dummy in columns))
+            for table, columns in self.columns.items()
+        )
+
+    def append(self, table, values):
+        '''
+        Appends row to the table in current batch.
+        '''
+        batch = self.batch[table]
+        for (name, kind), value in zip(self.columns[table], values):
+            batch[name].append(convert_value(value, kind))
+
+    def add(self, bug):
+        '''
+        Adds bug to the export, errors from get_bugs are skipped.
+        '''
+        if isinstance(bug, Exception):
+            return
+        bug_id = bug.bug_id
+        self.append(
+            'bugs',
+            [getattr(bug, name, None) for name, dummy in self.columns['bugs']]
+        )
+        for index, comment in enumerate(bug.comments):
+            self.append('comments', [
+                bug_id, index, comment['who'], comment['bug_when'],
+                comment['private'], comment['thetext'],
+            ])
+        for attachment in bug.attachments:
+            self.append(
+                'attachments',
+                [bug_id] + [attachment[name] for name in ATTACHMENT_COLUMNS]
+            )
+        for flag in bug.flags:
+            self.append('flags', [bug_id] + [
+                flag.get(name) for name, dummy in FLAG_EXPORT_COLUMNS[1:]
+            ])
+        self.pending += 1
+        self.count += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def extend(self, bugs):
+        '''
+        Adds bugs from iterable to the export.
+        '''
+        for bug in bugs:
+            self.add(bug)
+
+    def flush(self):
+        '''
+        Writes current batch.
+        '''
+        if not self.pending:
+            return
+        for table in EXPORT_TABLES:
+            self.write_batch(table, self.batch[table])
+        self.batch = self.new_batch()
+        self.pending = 0
+
+    def write_batch(self, table, columns):
+        '''
+        Stores columns of single table.
+        '''
+        raise NotImplementedError()
+
+    def close(self):
+        '''
+        Writes remaining data.
+        '''
+        self.flush()
+
+
+class MemoryExporter(BugExporter):
+    '''
+    Exporter collecting columns in memory.
+    '''
+    def __init__(self, fields=BUG_EXPORT_FIELDS, batch_size=EXPORT_BATCH):
+        super(MemoryExporter, self).__init__(fields, batch_size)
+        self.tables = self.new_batch()
+
+    def write_batch(self, table, columns):
+        for name, values in columns.items():
+            self.tables[table][name].extend(values)
+
+
+class CSVExporter(BugExporter):
+    '''
+    Exporter writing CSV file for each table into a directory.
+    '''
+    def __init__(self, directory, fields=BUG_EXPORT_FIELDS,
+                 batch_size=EXPORT_BATCH):
+        super(CSVExporter, self).__init__(fields, batch_size)
+        self.directory = directory
+        self.handles = {}
+        self.writers = {}
+
+    def get_writer(self, table):
+        '''
+        Returns CSV writer for table, writing header for new file.
+        '''
+        if table not in self.writers:
+            filename = os.path.join(self.directory, '{0}.csv'.format(table))
+            if six.PY2:
+                handle = open(filename, 'wb')
+            else:
+                handle = io.open(filename, 'w', newline='', encoding='utf-8')
+            self.handles[table] = handle
+            self.writers[table] = csv.writer(handle)
+            self.writers[table].writerow(
+                [name for name, dummy in self.columns[table]]
+            )
+        return self.writers[table]
+
+    def write_batch(self, table, columns):
+        writer = self.get_writer(table)
+        for row in zip(*columns.values()):
+            writer.writerow([self.format_value(value) for value in row])
+
+    @staticmethod
+    def format_value(value):
+        '''
+        Formats value for CSV.
+        '''
+        if value is None:
+            return ''
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if six.PY2 and isinstance(value, six.text_type):
+            return value.encode('utf-8')
+        return value
+
+    def close(self):
+        super(CSVExporter, self).close()
+        for table in EXPORT_TABLES:
+            self.get_writer(table)
+            self.handles[table].close()
+
+
+class ParquetExporter(BugExporter):
+    '''
+    Exporter writing Parquet file for each table into a directory.
+
+    Needs pyarrow module.
+    '''
+    def __init__(self, directory, fields=BUG_EXPORT_FIELDS,
+                 batch_size=EXPORT_BATCH):
+        if pyarrow is None:
+            raise ImportError('pyarrow is needed for Parquet export')
+        super(ParquetExporter, self).__init__(fields, batch_size)
+        self.directory = directory
+        self.writers = {}
+
+    def get_schema(self, table):
+        '''
+        Returns Arrow schema for table.
+        '''
+        types = {
+            'int': pyarrow.int64(),
+            'bool': pyarrow.bool_(),
+            'timestamp': pyarrow.timestamp('us'),
+            'string': pyarrow.string(),
+        }
+        return pyarrow.schema([
+            (name, types[kind]) for name, kind in self.columns[table]
+        ])
+
+    def get_writer(self, table):
+        '''
+        Returns Parquet writer for table.
+        '''
+        if table not in self.writers:
+            self.writers[table] = pyarrow.parquet.ParquetWriter(
+                os.path.join(self.directory, '{0}.parquet'.format(table)),
+                self.get_schema(table)
+            )
+        return self.writers[table]
+
+    def write_batch(self, table, columns):
+        schema = self.get_schema(table)
+        self.get_writer(table).write_table(pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(values, type=field.type)
+                for field, values in zip(schema, columns.values())
+            ],
+            schema=schema
+        ))
+
+    def close(self):
+        super(ParquetExporter, self).close()
+        for table in EXPORT_TABLES:
+            self.get_writer(table).close()
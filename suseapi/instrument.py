@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Instrumentation hooks for remote calls and parsing.
+
+Every remote call and parse step is wrapped in :func:`measure`, which
+passes :class:`Measurement` to all registered hooks once the operation is
+completed. Cache lookups are reported using :func:`record_cache`.
+'''
+from contextlib import contextmanager
+import logging
+import threading
+from timeit import default_timer
+
+HOOKS = []
+
+LOGGER = logging.getLogger('suse.instrument')
+
+
+class Measurement(object):
+    '''
+    Information about single measured operation.
+    '''
+    def __init__(self, component, operation, kind='call'):
+        self.component = component
+        self.operation = operation
+        self.kind = kind
+        self.duration = 0.0
+        self.bytes = 0
+        self.retries = 0
+        self.hit = None
+        self.error = None
+
+
+def add_hook(hook):
+    '''
+    Registers hook to be called with every Measurement.
+    '''
+    HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    '''
+    Unregisters previously registered hook.
+    '''
+    HOOKS.remove(hook)
+
+
+def emit(measurement):
+    '''
+    Passes measurement to all registered hooks.
+    '''
+    for hook in list(HOOKS):
+        try:
+            hook(measurement)
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.exception('instrumentation hook %r failed', hook)
+
+
+@contextmanager
+def measure(component, operation):
+    '''
+    Context manager measuring the wrapped operation.
+
+    The yielded Measurement can be used to record transferred bytes or
+    retries.
+    '''
+    measurement = Measurement(component, operation)
+    start = default_timer()
+    try:
+        yield measurement
+    except Exception as error:
+        measurement.error = error
+        raise
+    finally:
+        measurement.duration = default_timer() - start
+        if HOOKS:
+            emit(measurement)
+
+
+def record_cache(component, operation, hit):
+    '''
+    Records cache hit or miss.
+    '''
+    if not HOOKS:
+        return
+    measurement = Measurement(component, operation, 'cache')
+    measurement.hit = hit
+    emit(measurement)
+
+
+class Aggregator(object):
+    '''
+    Hook aggregating measurements in memory.
+    '''
+    counters = (
+        'calls', 'errors', 'seconds', 'bytes', 'retries',
+        'cache_hits', 'cache_misses',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def __call__(self, measurement):
+        key = (measurement.component, measurement.operation)
+        with self._lock:
+            if key not in self.stats:
+                self.stats[key] = dict(
+                    [(name, 0) for name in self.counters],
+                    seconds_max=0.0
+                )
+            stats = self.stats[key]
+            if measurement.kind == 'cache':
+                if measurement.hit:
+                    stats['cache_hits'] += 1
+                else:
+                    stats['cache_misses'] += 1
+                return
+            stats['calls'] += 1
+            stats['seconds'] += measurement.duration
+            stats['seconds_max'] = max(
+                stats['seconds_max'], measurement.duration
+            )
+            stats['bytes'] += measurement.bytes
+            stats['retries'] += measurement.retries
+            if measurement.error is not None:
+                stats['errors'] += 1
+
+    def snapshot(self):
+        '''
+        Returns copy of aggregated statistics.
+        '''
+        with self._lock:
+            return dict(
+                [(key, dict(value)) for key, value in self.stats.items()]
+            )
+
+    def reset(self):
+        '''
+        Clears aggregated statistics.
+        '''
+        with self._lock:
+            self.stats = {}
+
+    def export(self, prefix='suseapi'):
+        '''
+        Returns statistics in Prometheus text exposition format.
+        '''
+        return export_prometheus(self.snapshot(), prefix)
+
+
+PROMETHEUS_METRICS = (
+    ('calls', 'calls_total', 'counter', 'Number of calls.'),
+    ('errors', 'errors_total', 'counter', 'Number of failed calls.'),
+    ('seconds', 'seconds_total', 'counter', 'Time spent in calls.'),
+    ('seconds_max', 'seconds_max', 'gauge', 'Longest call duration.'),
+    ('bytes', 'bytes_total', 'counter', 'Number of transferred bytes.'),
+    ('retries', 'retries_total', 'counter', 'Number of retries.'),
+    ('cache_hits', 'cache_hits_total', 'counter', 'Number of cache hits.'),
+    ('cache_misses', 'cache_misses_total', 'counter',
+     'Number of cache misses.'),
+)
+
+
+def export_prometheus(stats, prefix='suseapi'):
+    '''
+    Formats statistics from Aggregator.snapshot in Prometheus text format.
+    '''
+    lines = []
+    for counter, name, metric_type, description in PROMETHEUS_METRICS:
+        name = '{0}_{1}'.format(prefix, name)
+        lines.append('# HELP {0} {1}'.format(name, description))
+        lines.append('# TYPE {0} {1}'.format(name, metric_type))
+        for key in sorted(stats):
+            lines.append(
+                '{0}{{component="{1}",operation="{2}"}} {3}'.format(
+                    name, key[0], key[1], stats[key][counter]
+                )
+            )
+    return '\n'.join(lines) + '\n'
@@ -22,10 +22,40 @@
 Parser for maintained data.
 '''
 
+from array import array
+import hashlib
+import json
+import logging
+import mmap
+import multiprocessing
 import os
+import pickle
+import struct
+import tempfile
+
+import six
+# pylint: disable=import-error
+from six.moves import intern
+# pylint: disable=import-error
+from six.moves.collections_abc import Sequence
 
 BASE_DIR = '/work/cd/data/maintained-CDs/'
 
+LOGGER = logging.getLogger('suse.maintained')
+
+# Version of persistent cache format, bump on incompatible changes
+CACHE_VERSION = 1
+
+# Minimal number of files to parse to make process pool worth it
+POOL_THRESHOLD = 16
+
+# Binary format of memory mapped data, see dump_maintained_map
+MAP_MAGIC = b'SMDP'
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct('<4sIIIII')
+MAP_UINT = struct.Struct('<I')
+MAP_PAIR = struct.Struct('<II')
+
 
 class MaintainedData(object):
     '''
@@ -99,13 +129,15 @@ def get_revision(base_dir=None):
         return int(lines[3])
 
 
-def load_maintained_data(base_dir=None):
+def list_maintained_files(base_dir=None):
     '''
-    Loads all maintained data and returs iterator over them.
+    Returns list of (name, path) tuples of maintained data files.
     '''
     if base_dir is None:
         base_dir = BASE_DIR
 
+    result = []
+
     for name in os.listdir(base_dir):
 
         # Ignore some files
@@ -118,8 +150,450 @@ def load_maintained_data(base_dir=None):
         if not os.path.isfile(fullname):
             continue
 
-        # Parse item
-        with open(fullname) as fileobj:
-            product = MaintainedData(name, fileobj)
+        result.append((name, fullname))
+
+    return result
+
+
+def parse_maintained_file(item):
+    '''
+    Parses single maintained data file given as (name, path) tuple.
+
+    This is top level function to be usable within process pool.
+    '''
+    name, fullname = item
+    with open(fullname) as fileobj:
+        return MaintainedData(name, fileobj)
+
+
+def load_maintained_data(base_dir=None):
+    '''
+    Loads all maintained data and returs iterator over them.
+    '''
+    for item in list_maintained_files(base_dir):
+        yield parse_maintained_file(item)
+
+
+def get_cache_file(base_dir=None):
+    '''
+    Returns default location of persistent cache for given directory.
+    '''
+    from xdg.BaseDirectory import save_cache_path
+    if base_dir is None:
+        base_dir = BASE_DIR
+    digest = hashlib.md5(
+        os.path.abspath(base_dir).encode('utf-8')
+    ).hexdigest()
+    return os.path.join(
+        save_cache_path('suseapi'),
+        'maintained-{0}.pickle'.format(digest)
+    )
+
+
+def _read_cache(cache_file):
+    '''
+    Reads persistent cache, returns None if it is not usable.
+    '''
+    try:
+        with open(cache_file, 'rb') as handle:
+            cache = pickle.load(handle)
+    except (IOError, OSError, EOFError, ValueError, pickle.PickleError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
+
+
+def _write_cache(cache_file, cache):
+    '''
+    Atomically writes persistent cache.
+    '''
+    handle, tmpname = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(cache_file)),
+        prefix='.maintained-'
+    )
+    try:
+        with os.fdopen(handle, 'wb') as tmpfile:
+            pickle.dump(cache, tmpfile, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmpname, cache_file)
+    except (IOError, OSError):
+        if os.path.exists(tmpname):
+            os.unlink(tmpname)
+        raise
+
 
-        yield product
+def _parse_files(items, processes):
+    '''
+    Parses list of files, using process pool for larger sets.
+    '''
+    if processes == 1 or len(items) < POOL_THRESHOLD:
+        return [parse_maintained_file(item) for item in items]
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(parse_maintained_file, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def load_maintained_data_cached(base_dir=None, cache_file=None,
+                                processes=None):
+    '''
+    Loads all maintained data and returns list of them.
+
+    Parsed data are stored in persistent cache. When SVN revision of the
+    checkout did not change, the cache is used as is, otherwise only files
+    with changed modification time or size are parsed again (in a process
+    pool of given size, defaults to number of CPUs).
+    '''
+    if base_dir is None:
+        base_dir = BASE_DIR
+    if cache_file is None:
+        cache_file = get_cache_file(base_dir)
+
+    try:
+        revision = get_revision(base_dir)
+    except (IOError, OSError, ValueError, IndexError):
+        revision = None
+
+    cache = _read_cache(cache_file)
+
+    # Unchanged checkout
+    if (cache is not None and revision is not None and
+            cache['revision'] == revision):
+        return [cache['files'][name][2] for name in cache['order']]
+
+    if cache is None:
+        cached_files = {}
+    else:
+        cached_files = cache['files']
+
+    files = {}
+    order = []
+    stale = []
+    for name, fullname in list_maintained_files(base_dir):
+        stat = os.stat(fullname)
+        order.append(name)
+        cached = cached_files.get(name)
+        if (cached is not None and
+                cached[0] == stat.st_mtime and cached[1] == stat.st_size):
+            files[name] = cached
+        else:
+            files[name] = (stat.st_mtime, stat.st_size, None)
+            stale.append((name, fullname))
+
+    for product in _parse_files(stale, processes):
+        mtime, size = files[product.name][:2]
+        files[product.name] = (mtime, size, product)
+
+    # The cache is only optimization, failing to store it is not fatal
+    try:
+        _write_cache(cache_file, {
+            'version': CACHE_VERSION,
+            'revision': revision,
+            'order': order,
+            'files': files,
+        })
+    except (IOError, OSError) as error:
+        LOGGER.warning(
+            'Failed to write maintained cache %s: %s', cache_file, error
+        )
+
+    return [files[name][2] for name in order]
+
+
+class MaintainedIndex(object):
+    '''
+    Index over maintained products allowing fast lookups.
+    '''
+    def __init__(self, products):
+        '''
+        Creates index from iterable of MaintainedData objects.
+
+        Package names in the products package lists are interned in place,
+        so the lists and the index share single copy of every name.
+        '''
+        self.products = list(products)
+        self.maintained = array(
+            'b', [product.is_maintained() for product in self.products]
+        )
+        self.distributions = {}
+        self.distributionstrings = {}
+        self.packages = {}
+        for pos, product in enumerate(self.products):
+            self._add_lookup(
+                self.distributions, product.data.get('Distribution'), pos
+            )
+            self._add_lookup(
+                self.distributionstrings,
+                product.data.get('Distributionstring'),
+                pos
+            )
+            packages = [intern(package) for package in product.packages]
+            if isinstance(product.packages, list):
+                product.packages[:] = packages
+            for package in packages:
+                if package not in self.packages:
+                    self.packages[package] = array('I')
+                self.packages[package].append(pos)
+
+    @staticmethod
+    def _add_lookup(lookup, key, pos):
+        '''
+        Adds product position to lookup table.
+        '''
+        if key is None:
+            return
+        if key not in lookup:
+            lookup[key] = array('I')
+        lookup[key].append(pos)
+
+    @classmethod
+    def load(cls, base_dir=None):
+        '''
+        Creates index from maintained data in given directory.
+        '''
+        return cls(load_maintained_data(base_dir))
+
+    def __len__(self):
+        return len(self.products)
+
+    def _get_products(self, positions, maintained_only):
+        '''
+        Converts list of positions to products.
+        '''
+        if maintained_only:
+            return [
+                self.products[pos] for pos in positions
+                if self.maintained[pos]
+            ]
+        return [self.products[pos] for pos in positions]
+
+    def get_maintained(self):
+        '''
+        Returns list of maintained products.
+        '''
+        return self._get_products(range(len(self.products)), True)
+
+    def by_package(self, package, maintained_only=False):
+        '''
+        Returns list of products shipping given package.
+        '''
+        return self._get_products(
+            self.packages.get(package, ()), maintained_only
+        )
+
+    def by_distribution(self, distribution, maintained_only=False):
+        '''
+        Returns list of products with given Distribution.
+        '''
+        return self._get_products(
+            self.distributions.get(distribution, ()), maintained_only
+        )
+
+    def by_distributionstring(self, distributionstring,
+                              maintained_only=False):
+        '''
+        Returns list of products with given Distributionstring.
+        '''
+        return self._get_products(
+            self.distributionstrings.get(distributionstring, ()),
+            maintained_only
+        )
+
+    def is_maintained(self, package):
+        '''
+        Checks whether package is shipped in any maintained product.
+        '''
+        for pos in self.packages.get(package, ()):
+            if self.maintained[pos]:
+                return True
+        return False
+
+
+def dump_maintained_map(products, filename):
+    '''
+    Stores maintained data in compact binary format suitable for
+    memory mapping by load_maintained_map.
+
+    The file consists of header, offsets into string table, (start, count)
+    pair for each product pointing into array of string indexes, the array
+    itself, string table with unique package names and JSON encoded
+    product names and data.
+
+    The file is replaced atomically, so processes which have mapped the
+    previous version keep using it.
+    '''
+    strings = {}
+    refs = array('I')
+    ranges = array('I')
+    meta = []
+    for product in products:
+        ranges.append(len(refs))
+        ranges.append(len(product.packages))
+        for package in product.packages:
+            if package not in strings:
+                strings[package] = len(strings)
+            refs.append(strings[package])
+        meta.append([product.name, product.data])
+
+    table = [None] * len(strings)
+    for package, pos in strings.items():
+        table[pos] = package.encode('utf-8')
+    offsets = array('I', [0])
+    for item in table:
+        offsets.append(offsets[-1] + len(item))
+
+    metadata = json.dumps(meta).encode('utf-8')
+
+    # Write to temporary file and rename it, the file might be mapped
+    handle, tmpname = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)),
+        prefix='.maintained-map-'
+    )
+    try:
+        with os.fdopen(handle, 'wb') as tmpfile:
+            tmpfile.write(MAP_HEADER.pack(
+                MAP_MAGIC, MAP_VERSION, len(table), len(meta), len(refs),
+                len(metadata)
+            ))
+            for values in (offsets, ranges, refs):
+                tmpfile.write(struct.pack(
+                    '<{0}I'.format(len(values)), *values
+                ))
+            tmpfile.write(b''.join(table))
+            tmpfile.write(metadata)
+        os.rename(tmpname, filename)
+    except (IOError, OSError):
+        if os.path.exists(tmpname):
+            os.unlink(tmpname)
+        raise
+
+
+class PackageList(Sequence):
+    '''
+    Read only list of packages backed by memory mapped file.
+    '''
+    def __init__(self, maintained_map, start, count):
+        self._map = maintained_map
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[pos] for pos in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError('package index out of range')
+        return self._map.get_string(
+            self._map.get_ref(self._start + index)
+        )
+
+    def __iter__(self):
+        for pos in range(self._start, self._start + self._count):
+            yield self._map.get_string(self._map.get_ref(pos))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class MappedMaintainedData(MaintainedData):
+    '''
+    Maintained data with packages stored in memory mapped file.
+    '''
+    # pylint: disable=super-init-not-called
+    def __init__(self, name, data, packages):
+        self.name = name
+        self.data = data
+        self.packages = packages
+
+
+class MaintainedMap(object):
+    '''
+    Memory mapped maintained data stored by dump_maintained_map.
+
+    The package data is shared between all processes mapping the same
+    file.
+    '''
+    def __init__(self, filename):
+        with open(filename, 'rb') as handle:
+            self._mmap = mmap.mmap(
+                handle.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        (magic, version, strings, products, refs,
+         metadata) = MAP_HEADER.unpack_from(self._mmap, 0)
+        if magic != MAP_MAGIC or version != MAP_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                'Not supported maintained map: {0}'.format(filename)
+            )
+        self._offsets = MAP_HEADER.size
+        self._ranges = self._offsets + MAP_UINT.size * (strings + 1)
+        self._refs = self._ranges + MAP_PAIR.size * products
+        self._strings = self._refs + MAP_UINT.size * refs
+        end = MAP_UINT.unpack_from(
+            self._mmap, self._offsets + MAP_UINT.size * strings
+        )[0]
+        meta_start = self._strings + end
+        self._meta = json.loads(
+            self._mmap[meta_start:meta_start + metadata].decode('utf-8')
+        )
+
+    def __len__(self):
+        return len(self._meta)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._meta)
+        if index < 0 or index >= len(self._meta):
+            raise IndexError('product index out of range')
+        name, data = self._meta[index]
+        start, count = MAP_PAIR.unpack_from(
+            self._mmap, self._ranges + MAP_PAIR.size * index
+        )
+        return MappedMaintainedData(
+            name, data, PackageList(self, start, count)
+        )
+
+    def __iter__(self):
+        for index in range(len(self._meta)):
+            yield self[index]
+
+    def get_ref(self, pos):
+        '''
+        Returns string index stored at given position.
+        '''
+        return MAP_UINT.unpack_from(
+            self._mmap, self._refs + MAP_UINT.size * pos
+        )[0]
+
+    def get_string(self, index):
+        '''
+        Returns string from string table.
+        '''
+        start, end = MAP_PAIR.unpack_from(
+            self._mmap, self._offsets + MAP_UINT.size * index
+        )
+        return six.ensure_str(
+            self._mmap[self._strings + start:self._strings + end]
+        )
+
+    def close(self):
+        '''
+        Unmaps the file.
+        '''
+        self._mmap.close()
+
+
+def load_maintained_map(filename):
+    '''
+    Loads maintained data stored by dump_maintained_map.
+    '''
+    return MaintainedMap(filename)
@@ -29,6 +29,7 @@ import re
 from six import string_types
 
 from suseapi.cacher import CacherMixin, DjangoCacherMixin
+from suseapi.instrument import measure, record_cache
 
 DATE_REGEXP = r'\w{3} (\d{4})-(\d{2})-(\d{2})'
 DATE_RANGE_MATCH = re.compile(
@@ -37,6 +38,8 @@ DATE_RANGE_MATCH = re.compile(
 DATE_MATCH = re.compile(r'\s' + DATE_REGEXP + r'\s*$')
 ABSENCE_MATCH = re.compile(r'(Absent|Vacation|Absence)\s*:\s')
 
+PRESENCE_PORT = 9874
+
 
 class PresenceError(Exception):
     '''
@@ -66,10 +69,11 @@ class Presence(CacherMixin):
     '''
     cache_key_template = 'presence-%s'
 
-    def __init__(self, hosts=None):
+    def __init__(self, hosts=None, port=PRESENCE_PORT):
         '''
         Creates presence class.
         '''
+        self.port = port
         if hosts is None:
             self.hosts = [
                 ('present.suse.de', False),
@@ -80,15 +84,14 @@ class Presence(CacherMixin):
         super(Presence, self).__init__()
         self.logger = logging.getLogger('suse.presence')
 
-    def _process_data(self, handle, who):
+    def _process_data(self, data, who):
         '''
         Parses response from the server.
         '''
         absences = []
         gather_data = 0
-        data = handle.read().decode('utf-8')
 
-        for line in data.splitlines():
+        for line in data.decode('utf-8').splitlines():
             line = line.rstrip()
             match = re.match(r"Login\s*:\s*(%s)\s*$" % who, line)
             if match:
@@ -122,33 +125,37 @@ class Presence(CacherMixin):
         '''
         Gets and parses presence data from single host.
         '''
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            # Set timeout for 1 second
-            sock.settimeout(1)
-            sock.connect((host, 9874))
-            if not no_send:
-                if isinstance(who, string_types):
-                    who_enc = who.encode("utf-8")
-                else:
-                    who_enc = who
-                sock.send(who_enc + b"\n")
-            handle = sock.makefile('rb', 0)
-            absences = self._process_data(handle, who)
+        with measure('presence', 'query') as measurement:
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                # Set timeout for 1 second
+                sock.settimeout(1)
+                sock.connect((host, self.port))
+                if not no_send:
+                    if isinstance(who, string_types):
+                        who_enc = who.encode("utf-8")
+                    else:
+                        who_enc = who
+                    sock.send(who_enc + b"\n")
+                handle = sock.makefile('rb', 0)
+                data = handle.read()
+                measurement.bytes = len(data)
 
-        except socket.error as error:
-            raise PresenceError(error, host)
-        finally:
-            sock.shutdown(socket.SHUT_RDWR)
-            sock.close()
+            except socket.error as error:
+                raise PresenceError(error, host)
+            finally:
+                sock.shutdown(socket.SHUT_RDWR)
+                sock.close()
 
-        return absences
+        with measure('presence', 'parse'):
+            return self._process_data(data, who)
 
     def get_presence_data(self, person):
         '''
         Gets complete presence data.
         '''
         absence_list = self.cache_get(person)
+        record_cache('presence', 'absences', absence_list is not None)
 
         if absence_list is None:
             absence_list = []
@@ -22,46 +22,82 @@
 Helper class for various namings used at SUSE.
 '''
 
+import functools
 
+
+# Replacements applied to upper cased codestream name
+CODESTREAM_REPLACEMENTS = (
+    ('SLE12', 'SLE-12'),
+    ('SLE11', 'SLE-11'),
+    ('SLE10', 'SLE-10'),
+    ('SLE9', 'SLE-9'),
+    ('SLED9', 'SLE-9'),
+    ('SLED10', 'SLE-10'),
+    ('SLED11', 'SLE-11'),
+    ('SLES9', 'SLE-9'),
+    ('SLES10', 'SLE-10'),
+    ('SLES11', 'SLE-11'),
+    ('OES11', 'OES-11'),
+    ('OES2', 'OES-2'),
+    ('-UPDATE', ''),
+    ('-STAGING', ''),
+)
+
+# Codestreams which do not follow the naming scheme
+CODESTREAM_SPECIAL = {
+    'SMT11-SP2': 'SLE-11-SP2-PRODUCTS',
+    'SLEPOS10': 'SLE-10-SP4',
+}
+
+# Maximal number of memoized results per function
+CACHE_SIZE = 4096
+
+
+def memoize(maxsize=CACHE_SIZE):
+    '''
+    Decorator to memoize single argument function.
+
+    The cache is flushed once it grows over maxsize entries.
+    '''
+    def decorator(function):
+        '''
+        Wraps the function with cache lookup.
+        '''
+        cache = {}
+
+        @functools.wraps(function)
+        def wrapper(name):
+            '''
+            Cache lookup wrapper.
+            '''
+            try:
+                return cache[name]
+            except KeyError:
+                pass
+            result = function(name)
+            if len(cache) >= maxsize:
+                cache.clear()
+            cache[name] = result
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@memoize()
 def codestream_name(name):
     '''
     Converts codestream name into standard form (as used by SMASH).
     '''
     # Standard replacing magic
-    dist = name.upper().replace(
-        'SLE12', 'SLE-12'
-    ).replace(
-        'SLE11', 'SLE-11'
-    ).replace(
-        'SLE10', 'SLE-10'
-    ).replace(
-        'SLE9', 'SLE-9'
-    ).replace(
-        'SLED9', 'SLE-9'
-    ).replace(
-        'SLED10', 'SLE-10'
-    ).replace(
-        'SLED11', 'SLE-11'
-    ).replace(
-        'SLES9', 'SLE-9'
-    ).replace(
-        'SLES10', 'SLE-10'
-    ).replace(
-        'SLES11', 'SLE-11'
-    ).replace(
-        'OES11', 'OES-11'
-    ).replace(
-        'OES2', 'OES-2'
-    ).replace(
-        '-UPDATE', ''
-    ).replace(
-        '-STAGING', ''
-    )
-    if dist == 'SMT11-SP2':
-        return 'SLE-11-SP2-PRODUCTS'
-
-    if dist == 'SLEPOS10':
-        return 'SLE-10-SP4'
+    dist = name.upper()
+    for old, new in CODESTREAM_REPLACEMENTS:
+        if old in dist:
+            dist = dist.replace(old, new)
+
+    if dist in CODESTREAM_SPECIAL:
+        return CODESTREAM_SPECIAL[dist]
 
     if '-' in dist:
         base, end = dist.rsplit('-', 1)
@@ -71,6 +107,14 @@ def codestream_name(name):
     return dist
 
 
+def codestream_names(names):
+    '''
+    Converts iterable of codestream names into list of standard forms.
+    '''
+    return [codestream_name(name) for name in names]
+
+
+@memoize()
 def codestream_base(name):
     '''
     Returns base of a codestream, without servicepack info.
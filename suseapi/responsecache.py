@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Disk cache of raw responses.
+
+Responses are stored compressed in files named by hash of the request and
+user, the cache is bounded in size and least recently used entries are
+evicted. Only read only requests are cached. In replay mode, these are
+served only from the cache.
+'''
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+
+# Default maximal size of the cache in bytes
+CACHE_SIZE = 256 * 1024 * 1024
+
+# Compression level for stored responses
+CACHE_COMPRESSION = 6
+
+
+class ResponseCache(object):
+    '''
+    Size bounded disk cache of responses.
+    '''
+
+    def __init__(self, directory=None, max_size=CACHE_SIZE, replay=False,
+                 max_age=None):
+        if directory is None:
+            from xdg.BaseDirectory import save_cache_path
+            directory = save_cache_path('suseapi', 'responses')
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.replay = replay
+        self.size = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url, params=None, base='', user=None):
+        '''
+        Returns cache key for request done by user.
+        '''
+        request = '{0}\n{1}\n{2}\n{3}'.format(
+            base, user or '', url, params or ''
+        )
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+    def get_filename(self, key):
+        '''
+        Returns name of file for given key.
+        '''
+        return os.path.join(self.directory, 'response-{0}.z'.format(key))
+
+    def get(self, key):
+        '''
+        Returns stored response dictionary or None.
+        '''
+        filename = self.get_filename(key)
+        try:
+            with open(filename, 'rb') as handle:
+                data = pickle.loads(zlib.decompress(handle.read()))
+            # Update access time for LRU eviction
+            os.utime(filename, None)
+        except (IOError, OSError, EOFError, ValueError, zlib.error,
+                pickle.PickleError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        if (self.max_age is not None and
+                data.get('time', 0) + self.max_age < time.time()):
+            return None
+        return data
+
+    def set(self, key, url, code, head, body):
+        '''
+        Stores response in the cache.
+        '''
+        if self.replay:
+            return
+        data = zlib.compress(
+            pickle.dumps(
+                {
+                    'url': url, 'code': code, 'head': head, 'body': body,
+                    'time': time.time(),
+                },
+                pickle.HIGHEST_PROTOCOL
+            ),
+            CACHE_COMPRESSION
+        )
+        handle, tmpname = tempfile.mkstemp(
+            dir=self.directory, prefix='.response-'
+        )
+        try:
+            with os.fdopen(handle, 'wb') as tmpfile:
+                tmpfile.write(data)
+            os.rename(tmpname, self.get_filename(key))
+        except (IOError, OSError):
+            if os.path.exists(tmpname):
+                os.unlink(tmpname)
+            raise
+        with self.lock:
+            if self.size is None:
+                self.size = self.get_size()
+            else:
+                self.size += len(data)
+            if self.size > self.max_size:
+                self.evict()
+
+    def get_entries(self):
+        '''
+        Returns list of cache entries as tuples of access time, size and
+        file name.
+        '''
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.startswith('response-'):
+                continue
+            filename = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            result.append((stat.st_mtime, stat.st_size, filename))
+        return result
+
+    def get_size(self):
+        '''
+        Returns total size of cached entries.
+        '''
+        return sum([entry[1] for entry in self.get_entries()])
+
+    def evict(self):
+        '''
+        Removes least recently used entries to fit into size limit.
+        '''
+        entries = sorted(self.get_entries())
+        self.size = sum([entry[1] for entry in entries])
+        for dummy, size, filename in entries:
+            if self.size <= self.max_size:
+                break
+            try:
+                os.unlink(filename)
+            except OSError:
+                continue
+            self.size -= size
+
+    def clear(self):
+        '''
+        Removes all entries from the cache.
+        '''
+        with self.lock:
+            for dummy, dummy, filename in self.get_entries():
+                try:
+                    os.unlink(filename)
+                except OSError:
+                    continue
+            self.size = 0
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Storage of login sessions shared across processes.
+
+The stores keep authentication cookies, so that workers accessing the same
+service log in once and reuse the session until it expires.
+'''
+from contextlib import contextmanager
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Default session lifetime in seconds
+SESSION_TTL = 12 * 3600
+
+# How long to wait for lock held by other process in Django store
+LOCK_TIMEOUT = 60
+
+
+def get_expiry(cookies, ttl):
+    '''
+    Returns session expiry time based on TTL and cookies expiry.
+    '''
+    expires = time.time() + ttl
+    for cookie in cookies:
+        if getattr(cookie, 'expires', None):
+            expires = min(expires, cookie.expires)
+    return expires
+
+
+class SessionStore(object):
+    '''
+    Base class for session stores.
+    '''
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+
+    def get(self, key):
+        '''
+        Returns stored cookies or None if there are none or they expired.
+        '''
+        raise NotImplementedError()
+
+    def set(self, key, cookies):
+        '''
+        Stores cookies.
+        '''
+        raise NotImplementedError()
+
+    def delete(self, key):
+        '''
+        Removes stored cookies.
+        '''
+        raise NotImplementedError()
+
+    @contextmanager
+    def lock(self, key):
+        '''
+        Exclusive lock for performing login.
+        '''
+        yield
+
+
+class FileSessionStore(SessionStore):
+    '''
+    Session store using files in a directory, locked using fcntl.
+    '''
+    _locks = {}
+    _locks_lock = threading.Lock()
+
+    def __init__(self, directory=None, ttl=SESSION_TTL):
+        super(FileSessionStore, self).__init__(ttl)
+        if directory is None:
+            from xdg.BaseDirectory import save_cache_path
+            directory = save_cache_path('suseapi')
+        self.directory = directory
+
+    def get_filename(self, key, extension='session'):
+        '''
+        Returns name of file for given key.
+        '''
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return os.path.join(
+            self.directory, 'session-{0}.{1}'.format(digest, extension)
+        )
+
+    def get(self, key):
+        try:
+            with open(self.get_filename(key), 'rb') as handle:
+                data = pickle.load(handle)
+        except (IOError, OSError, EOFError, ValueError, pickle.PickleError):
+            return None
+        if not isinstance(data, dict) or data.get('expires', 0) < time.time():
+            return None
+        return data['cookies']
+
+    def set(self, key, cookies):
+        data = {
+            'expires': get_expiry(cookies, self.ttl),
+            'cookies': cookies,
+        }
+        handle, tmpname = tempfile.mkstemp(
+            dir=self.directory, prefix='.session-'
+        )
+        try:
+            with os.fdopen(handle, 'wb') as tmpfile:
+                pickle.dump(data, tmpfile, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmpname, self.get_filename(key))
+        except (IOError, OSError):
+            if os.path.exists(tmpname):
+                os.unlink(tmpname)
+            raise
+
+    def delete(self, key):
+        try:
+            os.unlink(self.get_filename(key))
+        except OSError:
+            pass
+
+    @contextmanager
+    def lock(self, key):
+        # fcntl locks are per process, serialize threads separately
+        filename = self.get_filename(key, 'lock')
+        with self._locks_lock:
+            thread_lock = self._locks.setdefault(filename, threading.Lock())
+        with thread_lock:
+            with open(filename, 'a') as handle:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class DjangoSessionStore(SessionStore):
+    '''
+    Session store using Django cache.
+    '''
+    def get(self, key):
+        from django.core.cache import cache
+        return cache.get(key)
+
+    def set(self, key, cookies):
+        from django.core.cache import cache
+        timeout = max(1, int(get_expiry(cookies, self.ttl) - time.time()))
+        cache.set(key, cookies, timeout)
+
+    def delete(self, key):
+        from django.core.cache import cache
+        cache.delete(key)
+
+    @contextmanager
+    def lock(self, key):
+        from django.core.cache import cache
+        lock_key = '{0}-lock'.format(key)
+        deadline = time.time() + LOCK_TIMEOUT
+        acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        while not acquired and time.time() < deadline:
+            time.sleep(0.1)
+            acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        try:
+            yield
+        finally:
+            if acquired:
+                cache.delete(lock_key)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Coalescing of concurrent identical calls.
+
+:class:`SingleFlight` makes concurrent calls with the same key share a
+single execution, :class:`MicroBatcher` groups single item requests
+arriving within short time window into one batch call.
+'''
+import threading
+
+
+class _Call(object):
+    '''
+    Call in progress shared by waiting threads.
+    '''
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    '''
+    Executes only one call per key at a time, concurrent callers with the
+    same key wait for it and get the same result.
+
+    When clone function is given, every caller of shared call gets own
+    copy of the result made by it.
+    '''
+    def __init__(self, clone=None):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.clone = clone
+
+    def do(self, key, func, *args, **kwargs):
+        '''
+        Executes func unless call with same key is already in progress.
+        '''
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return self._get_result(call)
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return self._get_result(call)
+
+    def _get_result(self, call):
+        '''
+        Returns result of call, copied when it is shared.
+        '''
+        if self.clone is None or not call.waiters:
+            return call.result
+        return self.clone(call.result)
+
+    def in_flight(self):
+        '''
+        Returns number of calls in progress.
+        '''
+        with self.lock:
+            return len(self.calls)
+
+
+class _Batch(object):
+    '''
+    Batch of keys collected within single window.
+    '''
+    def __init__(self):
+        self.keys = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = {}
+        self.error = None
+
+
+class MicroBatcher(object):
+    '''
+    Groups requests for single keys into batches.
+
+    First caller waits for window seconds (or until max_size keys are
+    collected) and then executes func with list of collected keys. The
+    func has to return dictionary mapping keys to results, values which
+    are exceptions are raised in the caller who asked for that key.
+    '''
+    def __init__(self, window=0.01, max_size=100):
+        self.window = window
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.batch = None
+
+    def submit(self, key, func):
+        '''
+        Adds key to current batch and returns its result.
+        '''
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = _Batch()
+            if key not in batch.keys:
+                batch.keys.append(key)
+            if len(batch.keys) >= self.max_size:
+                self.batch = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self.lock:
+                if self.batch is batch:
+                    self.batch = None
+            try:
+                batch.results = func(batch.keys)
+            except Exception as exc:
+                batch.error = exc
+                raise
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+
+        result = batch.results.get(key)
+        if isinstance(result, Exception):
+            raise result
+        return result
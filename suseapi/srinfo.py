@@ -22,51 +22,216 @@
 SR information fetcher.
 '''
 
-# pylint: disable=import-error
-from six.moves.urllib.request import build_opener
+from datetime import datetime, timedelta
+import logging
+from multiprocessing.pool import ThreadPool
+import re
+import socket
 import xml.etree.cElementTree
+
+# pylint: disable=import-error
+from six.moves import queue
+# pylint: disable=import-error
+from six.moves.http_client import (
+    HTTPConnection, HTTPSConnection, HTTPException,
+)
+# pylint: disable=import-error
+from six.moves.urllib.error import HTTPError
+# pylint: disable=import-error
+from six.moves.urllib.parse import urlparse
 import dateutil.parser
 import suseapi
+from suseapi.cacher import CacherMixin, DjangoCacherMixin
+from suseapi.instrument import measure, record_cache
 
 SRINFO_SERVER = 'http://kueue.hwlab.suse.de:8080/'
 
+# Timeout for single request in seconds
+SRINFO_TIMEOUT = 20
+
+# Number of concurrent connections used for bulk lookups
+SRINFO_WORKERS = 8
+
+LASTUPDATE_MATCH = re.compile(
+    br'<lastupdate>(?:<!\[CDATA\[)?([^<\]]*)(?:\]\]>)?</lastupdate>'
+)
+
+
+class ConnectionPool(object):
+    '''
+    Pool of persistent (keep-alive) HTTP connections to single server.
+    '''
+    def __init__(self, url, timeout=SRINFO_TIMEOUT, size=SRINFO_WORKERS):
+        parsed = urlparse(url)
+        if parsed.scheme == 'https':
+            self.connection_class = HTTPSConnection
+        else:
+            self.connection_class = HTTPConnection
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(size)
+
+    def _connect(self):
+        '''
+        Creates new connection.
+        '''
+        return self.connection_class(
+            self.host, self.port, timeout=self.timeout
+        )
+
+    def _acquire(self):
+        '''
+        Returns tuple of idle or new connection and flag whether it was
+        already used.
+        '''
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, connection):
+        '''
+        Returns connection to the pool.
+        '''
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def get(self, path, headers=None):
+        '''
+        Performs GET request and returns tuple of status, reason and body.
+        '''
+        if headers is None:
+            headers = {}
+        connection, reused = self._acquire()
+        while True:
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (HTTPException, socket.error):
+                connection.close()
+                # Server has closed idle keep-alive connection, retry
+                # with fresh one
+                if not reused:
+                    raise
+                connection, reused = self._connect(), False
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+
+        return response.status, response.reason, data
 
-class SRInfo(object):
+    def close(self):
+        '''
+        Closes all idle connections.
+        '''
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SRInfo(CacherMixin):
     '''
     Class for accessing SR information.
     '''
-    def __init__(self):
-        self.opener = build_opener()
-        self.opener.addheaders += [
-            ('User-agent', suseapi.USER_AGENT),
-        ]
+    cache_key_template = 'srinfo-%s'
+
+    # How long is cached information used without checking the server
+    cache_ttl = timedelta(hours=1)
+
+    # How long is remembered that SR does not exist
+    negative_ttl = timedelta(minutes=10)
+
+    def __init__(self, server=SRINFO_SERVER, timeout=SRINFO_TIMEOUT,
+                 workers=SRINFO_WORKERS):
+        self.server = server
+        self.workers = workers
+        self.pool = ConnectionPool(server, timeout, workers)
+        self.headers = {
+            'User-agent': suseapi.USER_AGENT,
+        }
+        self.logger = logging.getLogger('suse.srinfo')
 
     def req(self, operation, srid):
         '''
-        Wrapper for invoking requests.
+        Wrapper for invoking requests, returns response body.
         '''
-        return self.opener.open(
-            '{0}{1}/{2}/'.format(SRINFO_SERVER, operation, srid),
-            None,
-            20
-        )
+        url = '{0}{1}/{2}/'.format(self.server, operation, srid)
+        with measure('srinfo', operation) as measurement:
+            status, reason, data = self.pool.get(
+                urlparse(url).path, self.headers
+            )
+            measurement.bytes = len(data)
+        if status >= 400:
+            raise HTTPError(url, status, reason, None, None)
+        return data
 
     def get_status(self, srid):
         '''
         Returns string with SR status.
         '''
-        response = self.req('srstatus', srid)
-        return response.read()
+        return self.req('srstatus', srid)
 
     def get_info(self, srid):
         '''
         Return dictionary with SR information.
+
+        The information is cached, after cache_ttl it is revalidated and
+        the cached information is kept if lastupdate did not change.
         '''
-        response = self.req('srinfo', srid)
-        data = response.read()
+        key = str(srid)
+        now = datetime.now()
+        cached = self.cache_get(key, True)
+        if cached is not None:
+            checked, info = cached
+            if info is None:
+                ttl = self.negative_ttl
+            else:
+                ttl = self.cache_ttl
+            if checked + ttl > now:
+                record_cache('srinfo', 'info', True)
+                return info
+
+        record_cache('srinfo', 'info', False)
+        data = self.req('srinfo', srid)
+
+        if cached is not None and self.is_unchanged(cached[1], data):
+            info = cached[1]
+        else:
+            with measure('srinfo', 'parse'):
+                info = self.parse_info(data)
+
+        self.cache_set(key, (now, info))
+        return info
 
+    @staticmethod
+    def is_unchanged(info, data):
+        '''
+        Checks whether lastupdate in response matches cached information.
+        '''
+        if info is None or 'lastupdate' not in info:
+            return False
+        match = LASTUPDATE_MATCH.search(data)
+        if match is None:
+            return False
+        lastupdate = dateutil.parser.parse(match.group(1).decode('utf-8'))
+        return lastupdate == info['lastupdate']
+
+    @staticmethod
+    def parse_info(data):
+        '''
+        Parses SR information from server response.
+        '''
         # Check for invalid ID
-        if data == 'No SR number':
+        if data.strip() == b'No SR number':
             return None
 
         # Parse XML
@@ -88,14 +253,46 @@ class SRInfo(object):
 
         return result
 
+    def _get_info_safe(self, srid):
+        '''
+        Wrapper around get_info returning exception on failure.
+        '''
+        try:
+            return srid, self.get_info(srid)
+        except (IOError, HTTPException, SyntaxError) as error:
+            self.logger.error('could not get info for SR %s: %s', srid, error)
+            return srid, error
 
-class DjangoSRInfo(SRInfo):
+    def get_info_many(self, srids, store_errors=False):
+        '''
+        Returns dictionary with information for several SRs.
+
+        The requests are performed concurrently. Failed lookups are
+        omitted from the result unless store_errors is set, in which case
+        the exception is stored instead of information.
+        '''
+        srids = list(set(srids))
+        if not srids:
+            return {}
+        pool = ThreadPool(min(self.workers, len(srids)))
+        try:
+            results = pool.map(self._get_info_safe, srids)
+        finally:
+            pool.close()
+            pool.join()
+        return dict([
+            (srid, info) for srid, info in results
+            if store_errors or not isinstance(info, Exception)
+        ])
+
+
+class DjangoSRInfo(SRInfo, DjangoCacherMixin):
     '''
-    Django wrapper for SR info, setting user-agent.
+    Django wrapper for SR info, setting user-agent and caching in Django.
     '''
     def __init__(self):
         super(DjangoSRInfo, self).__init__()
         from django.conf import settings
-        self.opener.addheaders += [
-            ('User-agent', settings.EMAIL_SUBJECT_PREFIX.strip('[] '))
-        ]
+        self.headers['User-agent'] = settings.EMAIL_SUBJECT_PREFIX.strip(
+            '[] '
+        )
@@ -31,6 +31,7 @@ from suds.client import Client
 from suds import WebFault
 
 from suseapi.browser import WebScraper, WebScraperError
+from suseapi.instrument import measure
 
 SWAMP_URL = 'http://swamp.suse.de:8080/axis/services/swamp?wsdl'
 
@@ -105,17 +106,24 @@ class SWAMP(object):
             ret[i.key] = self._map2dict(i.value)
         return ret
 
+    def _call(self, method, *args):
+        '''
+        Invokes SOAP method.
+        '''
+        with measure('swamp', method):
+            return getattr(self._client.service, method)(*args)
+
     def getMethodDoc(self, name):
         '''
         Gets online documentation for method.
         '''
-        return self._client.service.getMethodDoc(name)
+        return self._call('getMethodDoc', name)
 
     def getAllDocs(self):
         '''
         Gets online documentation for all methods.
         '''
-        return self._map2dict(self._client.service.getAllDocs())
+        return self._map2dict(self._call('getAllDocs'))
 
     def login(self):
         '''
@@ -127,8 +135,8 @@ class SWAMP(object):
         '''
         Gets SWAMP property.
         '''
-        return self._client.service.doGetProperty(
-            name, self._user, self._password
+        return self._call(
+            'doGetProperty', name, self._user, self._password
         )
 
     def getWorkflowInfo(self, wfid):
@@ -136,8 +144,8 @@ class SWAMP(object):
         Gets the workflows properties.
         '''
         return self._map2dict(
-            self._client.service.getWorkflowInfo(
-                wfid, self._user, self._password
+            self._call(
+                'getWorkflowInfo', wfid, self._user, self._password
             )
         )
 
@@ -145,24 +153,24 @@ class SWAMP(object):
         '''
         Gets all workflows data paths.
         '''
-        return self._client.service.doGetAllDataPaths(
-            wfid, self._user, self._password
+        return self._call(
+            'doGetAllDataPaths', wfid, self._user, self._password
         )[0]
 
     def doGetData(self, wfid, path):
         '''
         Gets workflow data bit.
         '''
-        return self._client.service.doGetData(
-            wfid, path, self._user, self._password
+        return self._call(
+            'doGetData', wfid, path, self._user, self._password
         )
 
     def doGetAllData(self, wfid):
         '''
         Gets all workflow data bits.
         '''
-        data = self._client.service.doGetAllData(
-            wfid, self._user, self._password
+        data = self._call(
+            'doGetAllData', wfid, self._user, self._password
         )
         if data == '':
             return {}
@@ -185,8 +193,8 @@ class SWAMP(object):
         Sets data bit in a workflow.
 
         '''
-        self._client.service.doSendData(
-            wfid, path, value, self._user, self._password
+        self._call(
+            'doSendData', wfid, path, value, self._user, self._password
         )
 
     def doSendEvent(self, wfid, event):
@@ -194,16 +202,16 @@ class SWAMP(object):
         Send event to a workflow.
 
         '''
-        self._client.service.doSendData(
-            wfid, event, self._user, self._password
+        self._call(
+            'doSendData', wfid, event, self._user, self._password
         )
 
     def doGetPlannedUpdateList(self):
         '''
         Returns a hash map with all active items from list of planned updates.
         '''
-        ret = self._client.service.doGetPlannedUpdateList(
-            self._user, self._password
+        ret = self._call(
+            'doGetPlannedUpdateList', self._user, self._password
         )
         return self._convert_pu_list(ret)
 
@@ -211,8 +219,8 @@ class SWAMP(object):
         '''
         Returns a sigle item from list of planned updates with given id.
         '''
-        ret = self._client.service.doGetPlannedUpdateItem(
-            wfid, self._user, self._password
+        ret = self._call(
+            'doGetPlannedUpdateItem', wfid, self._user, self._password
         )
         return self._map2dict(ret)
 
@@ -222,8 +230,8 @@ class SWAMP(object):
         that match the given criterias.
         '''
         args = self._dict2map(kwargs)
-        ret = self._client.service.doSearchPlannedUpdateList(
-            args, self._user, self._password
+        ret = self._call(
+            'doSearchPlannedUpdateList', args, self._user, self._password
         )
         return self._convert_pu_list(ret)
 
@@ -232,8 +240,8 @@ class SWAMP(object):
         Adds a new item to the list of planned updates.
         '''
         args = self._dict2map(data)
-        return self._client.service.doAddPUListItem(
-            args, self._user, self._password
+        return self._call(
+            'doAddPUListItem', args, self._user, self._password
         )
 
     def doRemovePUListItem(self, wfid):
@@ -241,8 +249,8 @@ class SWAMP(object):
         Removes a sigle item from list of planned updates with given id.
         (Sets it to inactive)
         '''
-        self._client.service.doRemovePUListItem(
-            wfid, self._user, self._password
+        self._call(
+            'doRemovePUListItem', wfid, self._user, self._password
         )
 
     def doModifyPUListItem(self, wfid, data):
@@ -252,8 +260,8 @@ class SWAMP(object):
         '''
         data['id'] = wfid
         args = self._dict2map(data)
-        return self._client.service.doModifyPUListItem(
-            args, self._user, self._password
+        return self._call(
+            'doModifyPUListItem', args, self._user, self._password
         )
 
     def getWorkflowIdList(self, filterstrings):
@@ -261,8 +269,8 @@ class SWAMP(object):
         Returns list of matching incidents.
         '''
         args = self._dict2map(filterstrings)
-        return self._client.service.getWorkflowIdList(
-            args, self._user, self._password
+        return self._call(
+            'getWorkflowIdList', args, self._user, self._password
         )
 
 
@@ -272,8 +280,13 @@ class WebSWAMP(WebScraper):
     '''
     def __init__(self, user, password,
                  base='https://swamp.suse.de/webswamp/swamp',
-                 useragent=None):
-        super(WebSWAMP, self).__init__(user, password, base, useragent)
+                 useragent=None, retry_policy=None, circuit_breaker=None,
+                 response_cache=None):
+        super(WebSWAMP, self).__init__(
+            user, password, base, useragent,
+            retry_policy=retry_policy, circuit_breaker=circuit_breaker,
+            response_cache=response_cache
+        )
         self.logger = logging.getLogger('suse.swamp')
 
     def login(self):
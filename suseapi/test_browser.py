@@ -24,6 +24,9 @@ Testing of browser wrapper.
 
 from __future__ import print_function
 
+import gzip
+import io
+import re
 import threading
 import time
 from unittest import TestCase
@@ -33,7 +36,13 @@ import httpretty
 # pylint: disable=import-error
 from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
 import suseapi.browser
-from suseapi.browser import WebScraper, WebScraperError
+from weblib.error import DataNotFound
+from suseapi.browser import (
+    CircuitBreaker, CircuitOpenError, RetryPolicy, WebScraper,
+    WebScraperError, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN,
+    extract_form,
+)
+from suseapi.instrument import Aggregator, add_hook, remove_hook
 
 TEST_BASE = 'http://example.net'
 
@@ -104,6 +113,118 @@ class WebScraperTest(TestCase):
             scraper.request, '500'
         )
 
+    @httpretty.activate
+    def test_compressed(self):
+        '''
+        Test compressed transfer.
+        '''
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as handle:
+            handle.write(b'TEST' * 100)
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            body=buf.getvalue(),
+            adding_headers={'Content-Encoding': 'gzip'}
+        )
+        scraper = WebScraper(None, None, TEST_BASE, transport='urllib3')
+        self.assertEqual(
+            'TEST' * 100,
+            scraper.request('action').unicode_body()
+        )
+        self.assertIn(
+            'gzip',
+            httpretty.last_request().headers['Accept-Encoding']
+        )
+
+    @httpretty.activate
+    def test_conditional(self):
+        '''
+        Test conditional requests.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            responses=[
+                httpretty.Response(body='TEST', adding_headers={
+                    'ETag': '"abc"',
+                    'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT',
+                }),
+                httpretty.Response(body='', status=304),
+            ]
+        )
+        scraper = WebScraper(None, None, TEST_BASE, transport='urllib3')
+        aggregator = Aggregator()
+        add_hook(aggregator)
+        try:
+            self.assertEqual('TEST', scraper.request('action').unicode_body())
+            self.assertEqual('TEST', scraper.request('action').unicode_body())
+        finally:
+            remove_hook(aggregator)
+        self.assertEqual(scraper.browser.doc.unicode_body(), 'TEST')
+        self.assertEqual(scraper.browser.doc.code, 200)
+        headers = httpretty.last_request().headers
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+        self.assertEqual(
+            headers['If-Modified-Since'], 'Mon, 05 Oct 2026 10:00:00 GMT'
+        )
+        stats = aggregator.snapshot()[('browser', 'conditional')]
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertEqual(scraper.validators_bytes, 4)
+
+    @httpretty.activate
+    def test_conditional_size(self):
+        '''
+        Test size limit of documents kept for conditional requests.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            body='TEST',
+            adding_headers={'ETag': '"abc"'},
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'other'),
+            body='OTHER',
+            adding_headers={'ETag': '"def"'},
+        )
+        original = suseapi.browser.VALIDATORS_BYTES
+        suseapi.browser.VALIDATORS_BYTES = 6
+        try:
+            scraper = WebScraper(None, None, TEST_BASE, transport='urllib3')
+            scraper.request('action')
+            scraper.request('other')
+        finally:
+            suseapi.browser.VALIDATORS_BYTES = original
+        self.assertEqual(list(scraper.validators), [TEST_BASE + '/other'])
+        self.assertEqual(scraper.validators_bytes, 5)
+
+    @httpretty.activate
+    def test_use_get(self):
+        '''
+        Test sending parameters in query string.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            body='TEST'
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            body='TEST'
+        )
+        scraper = WebScraper(
+            None, None, TEST_BASE, transport='urllib3', use_get=True
+        )
+        scraper.fetch('action', id=1)
+        self.assertEqual(httpretty.last_request().method, 'GET')
+        self.assertEqual(httpretty.last_request().querystring, {'id': ['1']})
+        # Requests with side effects are still posted
+        scraper.request('action', id=1)
+        self.assertEqual(httpretty.last_request().method, 'POST')
+
     def test_cookies(self):
         '''
         Test cookie getting and setting.
@@ -135,3 +256,219 @@ class WebScraperTest(TestCase):
             suseapi.browser.DEFAULT_TIMEOUT = original_timeout
             server.shutdown()
             server_thread.join()
+
+
+class RetryTest(TestCase):
+    '''
+    Tests retry policy and circuit breaker.
+    '''
+    def get_scraper(self, **kwargs):
+        '''
+        Returns scraper with retry policy not sleeping.
+        '''
+        policy = RetryPolicy(retries=2)
+        self.delays = []
+        policy.sleep = self.delays.append
+        return WebScraper(
+            None, None, TEST_BASE, transport='urllib3',
+            retry_policy=policy, **kwargs
+        )
+
+    @httpretty.activate
+    def test_retry(self):
+        '''
+        Test retrying on temporary failure.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            responses=[
+                httpretty.Response(body='', status=503),
+                httpretty.Response(body='TEST'),
+            ]
+        )
+        scraper = self.get_scraper()
+        self.assertEqual('TEST', scraper.request('action').unicode_body())
+        self.assertEqual(len(self.delays), 1)
+
+    @httpretty.activate
+    def test_retry_post(self):
+        '''
+        Test posting is retried only for read only requests.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            '{0}/{1}'.format(TEST_BASE, 'create'),
+            responses=[
+                httpretty.Response(body='', status=503),
+                httpretty.Response(body='', status=503),
+                httpretty.Response(body='TEST'),
+            ]
+        )
+        scraper = self.get_scraper()
+        self.assertRaises(WebScraperError, scraper.request, 'create', bugid=1)
+        self.assertEqual(self.delays, [])
+        self.assertEqual(
+            'TEST', scraper.fetch('create', bugid=1).unicode_body()
+        )
+        self.assertEqual(len(self.delays), 1)
+
+    @httpretty.activate
+    def test_retry_exhausted(self):
+        '''
+        Test giving up after configured number of retries.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            status=502
+        )
+        scraper = self.get_scraper()
+        self.assertRaises(WebScraperError, scraper.request, 'action')
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(self.delays[0] <= self.delays[1] * 2)
+
+    @httpretty.activate
+    def test_no_retry(self):
+        '''
+        Test client errors are not retried.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            status=500
+        )
+        scraper = self.get_scraper()
+        self.assertRaises(WebScraperError, scraper.request, 'action')
+        self.assertEqual(self.delays, [])
+
+    @httpretty.activate
+    def test_retry_after(self):
+        '''
+        Test honoring Retry-After header.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            responses=[
+                httpretty.Response(
+                    body='', status=503, adding_headers={'Retry-After': '7'}
+                ),
+                httpretty.Response(body='TEST'),
+            ]
+        )
+        scraper = self.get_scraper()
+        scraper.request('action')
+        self.assertEqual(self.delays, [7])
+
+    @httpretty.activate
+    def test_circuit(self):
+        '''
+        Test circuit opening on repeated failures.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            status=503
+        )
+        breaker = CircuitBreaker(TEST_BASE, threshold=3)
+        scraper = self.get_scraper(circuit_breaker=breaker)
+        self.assertRaises(WebScraperError, scraper.request, 'action')
+        self.assertEqual(breaker.get_state()['state'], CIRCUIT_OPEN)
+        self.assertRaises(CircuitOpenError, scraper.request, 'action')
+        self.assertEqual(breaker.get_state()['rejected'], 1)
+
+    def test_circuit_reset(self):
+        '''
+        Test circuit closing after successful trial request.
+        '''
+        breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+
+FORM_HTML = '''<html><body>
+<form name="other" action="/other.cgi"><input name="x" value="y"></form>
+<form name="changeform" method="POST" action="process.cgi">
+<input type="hidden" name="id" value="1">
+<input type="checkbox" name="cc" value="1" checked>
+<input type="checkbox" name="addselfcc">
+<input type="submit" name="commit" value="Commit">
+<select name="priority">
+<option value="P1">P1</option><option selected>P2</option>
+</select>
+<select name="product"><option value="A">A</option></select>
+<textarea name="comment">Fish &amp; chips</textarea>
+</form>
+<div>%s</div>
+</body></html>'''
+
+
+class FormExtractorTest(TestCase):
+    def test_extract(self):
+        '''
+        Test extracting form fields.
+        '''
+        form = extract_form(
+            FORM_HTML % ('x' * 100000), 'changeform', 'http://example.net/a/'
+        )
+        self.assertEqual(form.url, 'http://example.net/a/process.cgi')
+        self.assertEqual(form.method, 'post')
+        self.assertEqual(
+            dict(form.form_fields()),
+            {
+                'id': '1',
+                'cc': '1',
+                'priority': 'P2',
+                'product': 'A',
+                'comment': 'Fish & chips',
+            }
+        )
+
+    def test_set_input(self):
+        '''
+        Test changing extracted form fields.
+        '''
+        form = extract_form(FORM_HTML, 'changeform')
+        form.set_input('cc', False)
+        form.set_input('addselfcc', True)
+        form.set_input('comment', 'Text')
+        self.assertNotIn('cc', form.form_fields())
+        self.assertEqual(form.form_fields()['addselfcc'], 'on')
+        self.assertIn(('comment', 'Text'), form.get_pairs())
+        self.assertRaises(DataNotFound, form.set_input, 'commit', 'x')
+
+    def test_skip(self):
+        '''
+        Test extracting form without skipped regions.
+        '''
+        html = FORM_HTML.replace(
+            '<textarea',
+            '<table class="skip"><input name="x"></table><textarea'
+        )
+        self.assertIn('x', extract_form(html, 'changeform').form_fields())
+        skip = re.compile('<table class="skip">.*?</table>')
+        form = extract_form(html, 'changeform', skip=skip)
+        self.assertNotIn('x', form.form_fields())
+        self.assertEqual(form.form_fields()['comment'], 'Fish & chips')
+
+    def test_pairs(self):
+        '''
+        Test submitted values are native strings.
+        '''
+        form = extract_form(FORM_HTML, 'changeform')
+        form.set_input('comment', u'\u010ca')
+        for name, value in form.get_pairs():
+            self.assertIsInstance(name, str)
+            self.assertIsInstance(value, str)
+
+    def test_missing(self):
+        '''
+        Test extracting not existing form.
+        '''
+        self.assertIsNone(extract_form(FORM_HTML, 'missing'))
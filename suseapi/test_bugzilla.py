@@ -23,15 +23,23 @@ Testing of Bugzilla connector
 '''
 
 import datetime
+import json
 import os
+import pickle
 from unittest import TestCase
 
 import httpretty
+# pylint: disable=import-error
+from six.moves.urllib.parse import parse_qs
 
 from suseapi.bugzilla import (APIBugzilla, Bugzilla, BugzillaInvalidBugId,
                               BugzillaLoginFailed, BugzillaNotFound,
-                              BugzillaNotPermitted, WebScraperError,
-                              escape_xml_text, get_django_bugzilla)
+                              BugzillaNotPermitted, BugzillaUpdateError,
+                              WebScraperError, escape_xml_text,
+                              get_django_bugzilla, UPDATE_DRY_RUN,
+                              UPDATE_FAILED, UPDATE_UPDATED, close_pool,
+                              copy_bugs, create_parse_pool, decode_bugs,
+                              encode_bugs)
 
 
 TEST_DATA = os.path.join(
@@ -76,6 +84,250 @@ class BugzillaTest(TestCase):
         self.assertEqual(bug.bug_id, '81873')
         self.assertTrue(bug.has_nonempty('classification'))
 
+    @httpretty.activate
+    def test_get_bugs_generator(self):
+        '''
+        Test getting bugs with ids from generator.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugs = bugzilla.get_bugs(bugid for bugid in [81873])
+        self.assertEqual(bugs[0].bug_id, '81873')
+        self.assertEqual(
+            parse_qs(httpretty.last_request().body.decode('utf-8'))['id'],
+            ['81873']
+        )
+
+    @staticmethod
+    def _get_bugs_xml(*names):
+        fragments = []
+        for name in names:
+            data = open(os.path.join(TEST_DATA, name)).read()
+            start = data.index('<bug', data.index('<bugzilla') + 1)
+            fragments.append(data[start:data.index('</bug>') + 6])
+        return '<bugzilla>{0}</bugzilla>'.format(''.join(fragments))
+
+    def _register_refresh(self, delta_ts, comments):
+        data = open(os.path.join(TEST_DATA, 'bug-81873.xml')).read()
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=data.replace('2009-09-22 14:17:15 +0200', delta_ts),
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://bugzilla.novell.com/jsonrpc.cgi',
+            body=json.dumps(comments),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugzilla.coalesce = False
+        return bugzilla, bugzilla.get_bug(81873)
+
+    @httpretty.activate
+    def test_refresh_bugs(self):
+        '''
+        Test refreshing bugs with fetching only new comments.
+        '''
+        bugzilla, bug = self._register_refresh('2014-01-01 10:00:00 +0200', {
+            'error': None,
+            'result': {'bugs': {'81873': {'comments': [
+                {'count': 37, 'creator': 'old', 'text': 'Old',
+                 'time': '2009-09-22T12:17:15Z', 'is_private': False},
+                {'count': 38, 'creator': 'new', 'text': 'New',
+                 'time': '2014-01-01T08:00:00Z', 'is_private': True},
+            ]}}},
+        })
+        bug.delta_ts = bug.delta_ts.replace(year=2013)
+        refreshed = bugzilla.refresh_bugs([bug])
+        self.assertEqual(len(refreshed[0].comments), 39)
+        self.assertEqual(len(bug.comments), 38)
+        self.assertEqual(refreshed[0].comments[-1]['who'], 'new')
+        self.assertTrue(refreshed[0].has_field('long_desc'))
+        self.assertTrue(refreshed[0].comments[-1]['private'])
+        self.assertEqual(
+            httpretty.last_request().querystring['method'], ['Bug.comments']
+        )
+
+    @httpretty.activate
+    def test_refresh_bugs_unchanged(self):
+        '''
+        Test refreshing bugs which were not changed.
+        '''
+        bugzilla, bug = self._register_refresh(
+            '2009-09-22 14:17:15 +0200', {}
+        )
+        self.assertIs(bugzilla.refresh_bugs([bug])[0], bug)
+
+    @httpretty.activate
+    def test_refresh_bugs_fallback(self):
+        '''
+        Test refreshing bugs falling back to full fetch.
+        '''
+        bugzilla, bug = self._register_refresh(
+            '2014-01-01 10:00:00 +0200',
+            {'error': {'message': 'Unknown method'}, 'result': None}
+        )
+        bug.delta_ts = bug.delta_ts.replace(year=2013)
+        refreshed = bugzilla.refresh_bugs([bug])
+        self.assertIsNot(refreshed[0], bug)
+        self.assertEqual(len(refreshed[0].comments), 38)
+
+    def test_copy(self):
+        '''
+        Test copied bugs do not share lists.
+        '''
+        data = self._get_bugs_xml('bug-81873.xml')
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bug = bugzilla._parse_bugs(data, [], False, False)[0]
+        copied = copy_bugs([bug, 1])
+        self.assertEqual(copied[1], 1)
+        self.assertEqual(copied[0].__dict__, bug.__dict__)
+        copied[0].comments[0]['who'] = 'other'
+        copied[0].comments.append({})
+        copied[0].cc_list.append('other')
+        self.assertNotEqual(bug.comments[0]['who'], 'other')
+        self.assertEqual(len(bug.comments), 38)
+        self.assertNotIn('other', bug.cc_list)
+
+    def test_serialize(self):
+        '''
+        Test serializing bugs.
+        '''
+        data = self._get_bugs_xml('bug-81871.xml', 'bug-81873.xml')
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugs = bugzilla._parse_bugs(data, [], False, False)
+        self.assertEqual(len(bugs), 2)
+        self.assertTrue(bugs[0].comments)
+        bugs[0].attachments.append({
+            'attachid': '1', 'desc': 'Patch', 'filename': 'x.patch',
+            'date': bugs[0].delta_ts, 'type': 'text/plain', 'size': '10',
+            'attacher': 'test', 'ispatch': True, 'isobsolete': False,
+        })
+        for loaded in (decode_bugs(encode_bugs(bugs, False)),
+                       [pickle.loads(pickle.dumps(bug)) for bug in bugs]):
+            for bug, other in zip(bugs, loaded):
+                self.assertEqual(bug.__dict__, other.__dict__)
+        record = bugs[0].to_record()
+        record['v'] = 0
+        self.assertRaises(ValueError, bugs[0].from_record, record)
+
+    def test_parse_parallel(self):
+        '''
+        Test parsing bugs in process pool.
+        '''
+        data = self._get_bugs_xml(
+            'bug-81873.xml', 'bug-20000000.xml', 'bug-582198.xml'
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        expected = bugzilla._parse_bugs(data, [], True, True)
+        bugzilla.parse_pool = create_parse_pool(2)
+        bugzilla.parse_threshold = 1
+        try:
+            bugs = bugzilla._parse_bugs(data, [], True, True)
+            self.assertRaises(
+                BugzillaNotFound, bugzilla._parse_bugs, data, [], False, False
+            )
+        finally:
+            close_pool(bugzilla.parse_pool)
+        self.assertEqual(len(bugs), 3)
+        self.assertEqual(bugs[0].__dict__, expected[0].__dict__)
+        self.assertEqual(bugs[2].__dict__, expected[2].__dict__)
+        self.assertIsInstance(bugs[1], BugzillaNotFound)
+        self.assertEqual(bugs[1].bug_id, '20000000')
+        # Small results are parsed without the pool
+        bugzilla.parse_threshold = 4
+        self.assertEqual(len(bugzilla._parse_bugs(data, [], True, True)), 3)
+
+    @httpretty.activate
+    def test_get_bug_fields(self):
+        '''
+        Test getting only some fields of a bug.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bug = bugzilla.get_bug(81873, fields=['bug_status'])
+        self.assertEqual(bug.bug_id, '81873')
+        self.assertTrue(bug.has_nonempty('bug_status'))
+        self.assertFalse(bug.has_nonempty('classification'))
+        self.assertEqual(bug.comments, [])
+        self.assertTrue(bug.has_field('bug_status'))
+        self.assertFalse(bug.has_field('long_desc'))
+        params = parse_qs(httpretty.last_request().body.decode('utf-8'))
+        self.assertEqual(params['includefield'], ['bug_id', 'bug_status'])
+        self.assertEqual(params['excludefield'], ['attachmentdata'])
+
+    @httpretty.activate
+    def test_get_bug_exclude(self):
+        '''
+        Test getting bug with excluded fields.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bug = bugzilla.get_bug(81873, exclude=['long_desc'])
+        self.assertTrue(bug.has_nonempty('classification'))
+        self.assertTrue(bug.has_field('bug_status'))
+        self.assertFalse(bug.has_field('long_desc'))
+        self.assertFalse(bug.has_field('attachmentdata'))
+        self.assertEqual(bug.comments, [])
+        loaded = bug.from_record(bug.to_record())
+        self.assertFalse(loaded.has_field('long_desc'))
+
+    @httpretty.activate
+    def test_get_bugs_conditional(self):
+        '''
+        Test revalidating fetched bugs using GET requests.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            responses=[
+                httpretty.Response(
+                    body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+                    adding_headers={'ETag': '"abc"'},
+                ),
+                httpretty.Response(body='', status=304),
+            ]
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3', use_get=True)
+        first = bugzilla.get_bugs([81873])
+        self.assertEqual(
+            httpretty.last_request().querystring['id'], ['81873']
+        )
+        second = bugzilla.get_bugs([81873])
+        self.assertEqual(
+            httpretty.last_request().headers['If-None-Match'], '"abc"'
+        )
+        self.assertEqual(first[0].bug_id, second[0].bug_id)
+        self.assertEqual(second[0].bug_status, 'NEW')
+
+    @httpretty.activate
+    def test_get_bug_batch(self):
+        '''
+        Test getting bug using batching.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi?ctype=xml&id=81873',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugzilla.batch_window = 0.01
+        bug = bugzilla.get_bug(81873)
+        self.assertEqual(bug.bug_id, '81873')
+        self.assertIsNone(bugzilla.get_bug(81872))
+
     @httpretty.activate
     def test_get_private_bug(self):
         '''
@@ -127,6 +379,38 @@ class BugzillaTest(TestCase):
         bugzilla = Bugzilla('', '', transport='urllib3')
         self.assertRaises(BugzillaLoginFailed, bugzilla.login)
 
+    @httpretty.activate
+    def test_login_cookies(self):
+        '''
+        Test login is skipped with valid login cookies.
+        '''
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        self.assertFalse(bugzilla.probe_login())
+        for name in bugzilla.login_cookies:
+            bugzilla.browser.cookies.set(name, 'x', '.novell.com')
+        self.assertTrue(bugzilla.probe_login())
+        bugzilla.login()
+        self.assertEqual(httpretty.latest_requests(), [])
+
+        other = Bugzilla('', '', transport='urllib3')
+        other.set_cookies(bugzilla.get_cookies())
+        self.assertTrue(other.probe_login())
+
+    @httpretty.activate
+    def test_login_force(self):
+        '''
+        Test forced login does not trust stale login cookies.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/index.cgi',
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        for name in bugzilla.login_cookies:
+            bugzilla.browser.cookies.set(name, 'x', '.novell.com')
+        self.assertRaises(BugzillaLoginFailed, bugzilla.login, force=True)
+        self.assertFalse(bugzilla.probe_login())
+
     @httpretty.activate
     def test_get_flag_bug(self):
         '''
@@ -251,6 +535,23 @@ class BugzillaTest(TestCase):
         self.httpretty_login()
         bugzilla = APIBugzilla('test', 'test', transport='urllib3')
         bugzilla.login()
+        self.assertEqual(httpretty.latest_requests(), [])
+        bugzilla.login(force=True)
+        self.assertTrue(httpretty.latest_requests())
+
+    @httpretty.activate
+    def test_apilogin_failed(self):
+        '''
+        Test failed HTTP authentication.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://apibugzilla.suse.com/show_bug.cgi',
+            status=401,
+        )
+        bugzilla = APIBugzilla('test', 'test', transport='urllib3')
+        bugzilla.login()
+        self.assertRaises(BugzillaLoginFailed, bugzilla.get_bug, 81873)
 
     @httpretty.activate
     def test_recent(self):
@@ -281,6 +582,71 @@ class BugzillaTest(TestCase):
             ]
         )
 
+    @httpretty.activate
+    def test_iter_search(self):
+        '''
+        Test paged search.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/buglist.cgi',
+            responses=[
+                httpretty.Response(
+                    body=open(os.path.join(TEST_DATA, 'bug-list.xml')).read()
+                ),
+                httpretty.Response(
+                    body='<feed xmlns="http://www.w3.org/2005/Atom"></feed>'
+                ),
+            ]
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        result = bugzilla.iter_search([('product', 'x')], page_size=11)
+        self.assertEqual(next(result), 847050)
+        self.assertEqual(len(list(result)), 10)
+        params = parse_qs(httpretty.last_request().body.decode('utf-8'))
+        self.assertEqual(params['offset'], ['11'])
+        self.assertEqual(params['limit'], ['11'])
+        self.assertEqual(params['order'], ['bug_id'])
+
+    @httpretty.activate
+    def test_search_bugs(self):
+        '''
+        Test pipelined search and fetch.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/buglist.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-list.xml')).read(),
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugs = list(bugzilla.search_bugs([], chunk_size=5, workers=2))
+        self.assertEqual(len(bugs), 3)
+        self.assertEqual(bugs[0].bug_id, '81873')
+
+        result = bugzilla.search_bugs([], chunk_size=1, workers=2)
+        self.assertEqual(next(result).bug_id, '81873')
+        result.close()
+
+    @httpretty.activate
+    def test_search_bugs_error(self):
+        '''
+        Test error propagation from pipelined search.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/buglist.cgi',
+            status=500,
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        self.assertRaises(
+            WebScraperError, list, bugzilla.search_bugs([])
+        )
+
     def test_escape(self):
         self.assertEqual(
             escape_xml_text('ahoj'),
@@ -306,6 +672,237 @@ class BugzillaTest(TestCase):
         bugzilla.load_update_form(872984)
         return bugzilla
 
+    @httpretty.activate
+    def test_get_srs(self):
+        '''
+        Test getting SR ids for several bugs.
+        '''
+        pages = []
+        link = (
+            '<a href="https://example.com/report?x=1%26lsMSRID=[123][456]'
+            '%26y=2">Report View</a>'
+        )
+
+        def callback(request, uri, headers):
+            '''
+            Returns XML or HTML bug page.
+            '''
+            if 'ctype' in parse_qs(request.body.decode('utf-8')):
+                name = 'bug-81873.xml'
+            else:
+                pages.append(uri)
+                name = 'bug-872984.html'
+                headers['content-type'] = 'text/html'
+            body = open(os.path.join(TEST_DATA, name)).read()
+            return (200, headers, body.replace('</body>', link + '</body>'))
+
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=callback,
+        )
+        bugzilla = Bugzilla('', '', transport='urllib3')
+        bugzilla._cache.pop(bugzilla.cache_key('sr-81873'), None)
+        self.assertEqual(bugzilla.get_srs([81873]), {81873: [123, 456]})
+        self.assertEqual(len(pages), 1)
+        # Cached based on delta_ts
+        self.assertEqual(bugzilla.get_srs(['81873']), {81873: [123, 456]})
+        self.assertEqual(len(pages), 1)
+        self.assertEqual(bugzilla.get_sr(81873), [123, 456])
+
+    @httpretty.activate
+    def test_load_update_fields(self):
+        bugzilla = self._load_update_form()
+        form = bugzilla.load_update_fields(872984)
+        self.assertEqual(
+            form.url, 'https://bugzilla.novell.com/process_bug.cgi'
+        )
+        self.assertEqual(
+            form.form_fields(), bugzilla.browser.doc.form_fields()
+        )
+
+    @httpretty.activate
+    def test_update_dry_run(self):
+        bugzilla = self._load_update_form()
+        bugzilla.force_readonly = True
+        changes = bugzilla.update_bug(872984, longdesclength='4')
+        self.assertEqual(changes, {'longdesclength': ('3', '4')})
+        result = bugzilla.update_bugs([(872984, {'longdesclength': '4'})])
+        self.assertEqual(result[0].status, UPDATE_DRY_RUN)
+        self.assertEqual(result[0].changes, changes)
+
+    @httpretty.activate
+    def test_update_bugs(self):
+        bugzilla = self._load_update_form()
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/process_bug.cgi',
+            responses=[
+                httpretty.Response(body='Mid-air collision!'),
+                httpretty.Response(body='Changes submitted for bug 872984'),
+                httpretty.Response(body='Error'),
+            ]
+        )
+        result = bugzilla.update_bugs(
+            [(872984, {'longdesclength': '4'})], workers=1
+        )
+        self.assertEqual(result[0].status, UPDATE_UPDATED)
+        self.assertEqual(result[0].attempts, 2)
+        self.assertEqual(result[0].changes, {'longdesclength': ('3', '4')})
+        result = bugzilla.update_bugs(
+            [(872984, {'longdesclength': '4'})], workers=1
+        )
+        self.assertEqual(result[0].status, UPDATE_FAILED)
+        self.assertIsInstance(result[0].error, BugzillaUpdateError)
+
+    @httpretty.activate
+    def test_bulk_update(self):
+        self.httpretty_login()
+        bug = open(os.path.join(TEST_DATA, 'bug-81873.xml')).read()
+        changed = bug.replace('<bug_status>NEW', '<bug_status>RESOLVED')
+        changed = changed.replace('2009-09-22 14:17:15', '2014-07-17 11:38:53')
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            responses=[
+                httpretty.Response(body=bug),
+                httpretty.Response(body=changed),
+            ]
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/buglist.cgi',
+            body=open(os.path.join(TEST_DATA, 'buglist-tweak.html')).read(),
+            content_type='text/html',
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/process_bug.cgi',
+            body='Changes submitted for bug 81873',
+        )
+        bugzilla = Bugzilla('test', 'test', transport='urllib3')
+        result = bugzilla.bulk_update([81873], bug_status='RESOLVED')
+        self.assertEqual(result[0].bug_id, 81873)
+        self.assertEqual(result[0].status, UPDATE_UPDATED)
+        self.assertEqual(
+            result[0].changes, {'bug_status': ('NEW', 'RESOLVED')}
+        )
+        submitted = [
+            request for request in httpretty.latest_requests()
+            if request.path == '/process_bug.cgi'
+        ]
+        params = parse_qs(submitted[-1].body.decode('utf-8'))
+        self.assertEqual(params['id_81873'], ['on'])
+        self.assertNotIn('id_81872', params)
+        self.assertEqual(params['bug_status'], ['RESOLVED'])
+
+    def _register_bulk_bug(self):
+        '''
+        Registers XML and HTML pages for bug 81873.
+        '''
+        xml = open(os.path.join(TEST_DATA, 'bug-81873.xml')).read()
+        html = open(os.path.join(TEST_DATA, 'bug-872984.html')).read()
+        html = html.replace(
+            '<input type="hidden" name="longdesclength" value="3">',
+            '<input type="hidden" name="longdesclength" value="3">'
+            '<input name="status_whiteboard" value="wasL3:1">'
+        )
+
+        def callback(request, uri, headers):
+            '''
+            Returns XML or HTML bug page.
+            '''
+            if 'ctype' in parse_qs(request.body.decode('utf-8')):
+                return (200, headers, xml)
+            headers['content-type'] = 'text/html'
+            return (200, headers, html)
+
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=callback,
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/buglist.cgi',
+            body=open(os.path.join(TEST_DATA, 'buglist-tweak.html')).read(),
+            content_type='text/html',
+        )
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/process_bug.cgi',
+            body='Changes submitted for bug 81873',
+        )
+
+    @staticmethod
+    def _submitted_params():
+        '''
+        Returns parameters of last submitted form.
+        '''
+        submitted = [
+            request for request in httpretty.latest_requests()
+            if request.path == '/process_bug.cgi'
+        ]
+        return parse_qs(submitted[-1].body.decode('utf-8'))
+
+    @httpretty.activate
+    def test_bulk_update_whiteboard(self):
+        self.httpretty_login()
+        self._register_bulk_bug()
+        bugzilla = Bugzilla('test', 'test', transport='urllib3')
+        result = bugzilla.bulk_update([81873], whiteboard_add='openL3')
+        self.assertEqual(result[0].bug_id, 81873)
+        self.assertEqual(result[0].status, UPDATE_UPDATED)
+        self.assertEqual(
+            result[0].changes,
+            {'status_whiteboard': ('wasL3:1', 'wasL3:1 openL3')}
+        )
+        self.assertEqual(
+            self._submitted_params()['status_whiteboard'], ['wasL3:1 openL3']
+        )
+        self.assertFalse([
+            request for request in httpretty.latest_requests()
+            if request.path.startswith('/buglist.cgi')
+        ])
+
+    @httpretty.activate
+    def test_bulk_update_whiteboard_dry_run(self):
+        self.httpretty_login()
+        self._register_bulk_bug()
+        bugzilla = Bugzilla('test', 'test', transport='urllib3',
+                            force_readonly=True)
+        result = bugzilla.bulk_update([81873], whiteboard_add='openL3')
+        self.assertEqual(result[0].status, UPDATE_DRY_RUN)
+        self.assertEqual(
+            result[0].changes,
+            {'status_whiteboard': ('wasL3:1', 'wasL3:1 openL3')}
+        )
+
+    @httpretty.activate
+    def test_bulk_update_fallback(self):
+        self.httpretty_login()
+        self._register_bulk_bug()
+        bugzilla = Bugzilla('test', 'test', transport='urllib3')
+        # The mass change form has no longdesclength field
+        result = bugzilla.bulk_update([81873], longdesclength='4')
+        self.assertEqual(result[0].bug_id, 81873)
+        self.assertEqual(result[0].status, UPDATE_UPDATED)
+        self.assertEqual(result[0].changes, {'longdesclength': ('3', '4')})
+        self.assertEqual(self._submitted_params()['longdesclength'], ['4'])
+
+    @httpretty.activate
+    def test_bulk_update_dry_run(self):
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://bugzilla.novell.com/show_bug.cgi',
+            body=open(os.path.join(TEST_DATA, 'bug-81873.xml')).read(),
+        )
+        bugzilla = Bugzilla('test', 'test', transport='urllib3',
+                            force_readonly=True)
+        result = bugzilla.bulk_update([81873], status_whiteboard='wasL3:1')
+        self.assertEqual(result[0].status, UPDATE_DRY_RUN)
+        self.assertEqual(result[0].changes, {})
+
     @httpretty.activate
     def test_select_update_form(self):
         bugzilla = self._load_update_form()
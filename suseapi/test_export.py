@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Testing of bug export.
+'''
+
+import csv
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipIf
+
+from lxml import etree as ElementTree
+
+from suseapi.bugzilla import Bug, BugzillaNotFound
+from suseapi.export import (
+    CSVExporter, MemoryExporter, ParquetExporter, pyarrow,
+)
+
+TEST_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'testdata'
+)
+
+
+def load_bugs():
+    '''
+    Loads bugs from test data.
+    '''
+    result = []
+    for name in ('bug-81871.xml', 'bug-81873.xml'):
+        with open(os.path.join(TEST_DATA, name), 'rb') as handle:
+            # pylint: disable=no-member
+            tree = ElementTree.fromstring(handle.read())
+        result.append(Bug(tree.find('bug')))
+    return result
+
+
+class ExportTest(TestCase):
+    '''
+    Bug export tests.
+    '''
+    def setUp(self):
+        self.bugs = load_bugs()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_memory(self):
+        '''
+        Test exporting into memory.
+        '''
+        exporter = MemoryExporter(batch_size=1)
+        with exporter:
+            exporter.extend(self.bugs + [BugzillaNotFound('NotFound')])
+        self.assertEqual(exporter.count, 2)
+        tables = exporter.tables
+        self.assertEqual(tables['bugs']['bug_id'], [81871, 81873])
+        self.assertIsNone(tables['bugs']['delta_ts'][0].tzinfo)
+        self.assertEqual(
+            len(tables['comments']['thetext']),
+            len(self.bugs[0].comments) + len(self.bugs[1].comments)
+        )
+        self.assertEqual(tables['comments']['index'][:2], [0, 1])
+        self.assertEqual(
+            tables['flags']['name'][:2], ['needinfo', 'SHIP_STOPPER']
+        )
+        self.assertEqual(tables['flags']['requestee'][1], None)
+        self.assertEqual(tables['attachments']['attachid'], [])
+
+    def test_csv(self):
+        '''
+        Test exporting into CSV files.
+        '''
+        with CSVExporter(self.directory, fields=('bug_id', 'cc_list')) as exp:
+            exp.extend(self.bugs)
+        for table in ('bugs', 'comments', 'attachments', 'flags'):
+            self.assertTrue(
+                os.path.exists(os.path.join(self.directory, table + '.csv'))
+            )
+        with io.open(os.path.join(self.directory, 'bugs.csv'), 'rb') as handle:
+            rows = list(csv.reader(
+                handle.read().decode('utf-8').splitlines()
+            ))
+        self.assertEqual(rows[0], ['bug_id', 'cc_list'])
+        self.assertEqual(rows[1][0], '81871')
+        self.assertEqual(rows[1][1], ','.join(self.bugs[0].cc_list))
+
+    @skipIf(pyarrow is None, 'pyarrow not installed')
+    def test_parquet(self):
+        '''
+        Test exporting into Parquet files.
+        '''
+        with ParquetExporter(self.directory, batch_size=1) as exporter:
+            exporter.extend(self.bugs)
+        table = pyarrow.parquet.read_table(
+            os.path.join(self.directory, 'bugs.parquet')
+        )
+        self.assertEqual(table.num_rows, 2)
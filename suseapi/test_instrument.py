@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Testing of instrumentation hooks.
+'''
+
+from unittest import TestCase
+
+import httpretty
+
+from suseapi.browser import WebScraper
+from suseapi.instrument import (
+    Aggregator, add_hook, remove_hook, measure, record_cache,
+)
+
+
+class InstrumentTest(TestCase):
+    '''
+    Instrumentation tests.
+    '''
+
+    def setUp(self):
+        self.aggregator = Aggregator()
+        add_hook(self.aggregator)
+
+    def tearDown(self):
+        remove_hook(self.aggregator)
+
+    def test_measure(self):
+        '''
+        Test measuring operation.
+        '''
+        with measure('test', 'operation') as measurement:
+            measurement.bytes = 10
+            measurement.retries = 1
+        stats = self.aggregator.snapshot()[('test', 'operation')]
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['bytes'], 10)
+        self.assertEqual(stats['retries'], 1)
+        self.assertEqual(stats['errors'], 0)
+
+    def test_error(self):
+        '''
+        Test measuring failed operation.
+        '''
+        with self.assertRaises(ValueError):
+            with measure('test', 'operation'):
+                raise ValueError('Failure')
+        stats = self.aggregator.snapshot()[('test', 'operation')]
+        self.assertEqual(stats['errors'], 1)
+
+    def test_cache(self):
+        '''
+        Test recording cache hits and misses.
+        '''
+        record_cache('test', 'cache', True)
+        record_cache('test', 'cache', False)
+        record_cache('test', 'cache', False)
+        stats = self.aggregator.snapshot()[('test', 'cache')]
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertEqual(stats['cache_misses'], 2)
+        self.assertEqual(stats['calls'], 0)
+
+    def test_broken_hook(self):
+        '''
+        Test that failing hook does not break measured code.
+        '''
+        def broken(measurement):
+            '''
+            Hook raising an error.
+            '''
+            raise ValueError(measurement)
+
+        add_hook(broken)
+        try:
+            with measure('test', 'operation'):
+                pass
+        finally:
+            remove_hook(broken)
+        self.assertIn(('test', 'operation'), self.aggregator.snapshot())
+
+    def test_export(self):
+        '''
+        Test Prometheus export.
+        '''
+        with measure('test', 'operation') as measurement:
+            measurement.bytes = 10
+        output = self.aggregator.export()
+        self.assertIn('# TYPE suseapi_calls_total counter\n', output)
+        self.assertIn(
+            'suseapi_bytes_total{component="test",operation="operation"} 10',
+            output
+        )
+        self.aggregator.reset()
+        self.assertEqual({}, self.aggregator.snapshot())
+
+    @httpretty.activate
+    def test_browser(self):
+        '''
+        Test instrumentation of browser requests.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://example.net/action',
+            body='TEST'
+        )
+        scraper = WebScraper(None, None, 'http://example.net',
+                             transport='urllib3')
+        scraper.request('action')
+        stats = self.aggregator.snapshot()[('browser', 'request')]
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['bytes'], 4)
@@ -24,9 +24,13 @@ Testing of maintained data parser.
 
 from unittest import TestCase
 import os.path
+import shutil
+import tempfile
 
 from suseapi.maintained import (
-    MaintainedData, load_maintained_data, get_revision
+    MaintainedData, load_maintained_data, get_revision,
+    load_maintained_data_cached, MaintainedIndex,
+    dump_maintained_map, load_maintained_map,
 )
 
 TEST_DATA = os.path.join(
@@ -73,3 +77,219 @@ class MaintainedTest(TestCase):
             1235,
             get_revision(TEST_DATA)
         )
+
+
+class MaintainedCacheTest(TestCase):
+    '''
+    Cached maintained data loader tests.
+    '''
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.datadir = os.path.join(self.tempdir, 'maintained')
+        self.cache_file = os.path.join(self.tempdir, 'cache')
+        shutil.copytree(TEST_DATA, self.datadir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def load(self, processes=1):
+        '''
+        Loads data using test cache file.
+        '''
+        return load_maintained_data_cached(
+            self.datadir, self.cache_file, processes
+        )
+
+    def test_load(self):
+        '''
+        Test loading directory with creating cache.
+        '''
+        data = self.load()
+        self.assertEqual(2, len(data))
+        self.assertTrue(os.path.exists(self.cache_file))
+        self.assertEqual(
+            sorted([item.name for item in data]),
+            ['opensuse', 'sles']
+        )
+
+    def test_same_revision(self):
+        '''
+        Test that unchanged revision uses cache without parsing.
+        '''
+        self.load()
+        os.unlink(os.path.join(self.datadir, 'sles'))
+        data = self.load()
+        self.assertEqual(2, len(data))
+
+    def test_changed_file(self):
+        '''
+        Test that only changed file is parsed again.
+        '''
+        first = dict([(item.name, item) for item in self.load()])
+        os.unlink(os.path.join(self.datadir, '.svn-entries'))
+        with open(os.path.join(self.datadir, 'opensuse'), 'a') as handle:
+            handle.write('new-package\n')
+        second = dict([(item.name, item) for item in self.load()])
+        self.assertEqual(
+            first['sles'].packages,
+            second['sles'].packages
+        )
+        self.assertIn('new-package', second['opensuse'].packages)
+        self.assertNotIn('new-package', first['opensuse'].packages)
+
+    def test_readonly_cache(self):
+        '''
+        Test that failure to write cache is not fatal.
+        '''
+        self.cache_file = os.path.join(self.tempdir, 'missing', 'cache')
+        data = self.load()
+        self.assertEqual(2, len(data))
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_pool(self):
+        '''
+        Test parsing in process pool.
+        '''
+        for i in range(20):
+            shutil.copy(
+                os.path.join(TEST_DATA, 'sles'),
+                os.path.join(self.datadir, 'sles-{0}'.format(i))
+            )
+        data = self.load(processes=2)
+        self.assertEqual(22, len(data))
+        self.assertTrue(all([item.packages for item in data]))
+
+
+class MaintainedIndexTest(TestCase):
+    '''
+    Maintained data index tests.
+    '''
+
+    def setUp(self):
+        self.index = MaintainedIndex.load(TEST_DATA)
+
+    def test_len(self):
+        '''
+        Test number of indexed products.
+        '''
+        self.assertEqual(2, len(self.index))
+        self.assertEqual(
+            ['sles'],
+            [item.name for item in self.index.get_maintained()]
+        )
+
+    def test_interned(self):
+        '''
+        Test package names are shared between index and products.
+        '''
+        keys = dict((name, name) for name in self.index.packages)
+        for product in self.index.products:
+            for package in product.packages:
+                self.assertIs(keys[package], package)
+
+    def test_package(self):
+        '''
+        Test lookup by package.
+        '''
+        self.assertEqual(
+            ['sles'],
+            [item.name for item in self.index.by_package('ModemManager')]
+        )
+        self.assertEqual([], self.index.by_package('nonexisting'))
+        self.assertTrue(self.index.is_maintained('ModemManager'))
+        self.assertFalse(self.index.is_maintained('nonexisting'))
+
+    def test_distribution(self):
+        '''
+        Test lookup by distribution.
+        '''
+        self.assertEqual(
+            ['sles'],
+            [
+                item.name for item in
+                self.index.by_distribution('sle11-sp2-x86_64')
+            ]
+        )
+        self.assertEqual(
+            ['sles'],
+            [
+                item.name for item in
+                self.index.by_distributionstring('SLES-11-SP2-x86_64', True)
+            ]
+        )
+
+
+class MaintainedMapTest(TestCase):
+    '''
+    Memory mapped maintained data tests.
+    '''
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'maintained.map')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_roundtrip(self):
+        '''
+        Test storing and loading memory mapped data.
+        '''
+        data = sorted(
+            load_maintained_data(TEST_DATA), key=lambda item: item.name
+        )
+        dump_maintained_map(data, self.filename)
+        mapped = load_maintained_map(self.filename)
+        try:
+            self.assertEqual(2, len(mapped))
+            for original, loaded in zip(data, mapped):
+                self.assertEqual(original.name, loaded.name)
+                self.assertEqual(original.data, loaded.data)
+                self.assertEqual(original.packages, list(loaded.packages))
+                self.assertEqual(
+                    original.is_maintained(), loaded.is_maintained()
+                )
+            packages = mapped[1].packages
+            self.assertEqual(packages[-1], data[1].packages[-1])
+            self.assertEqual(packages[1:3], data[1].packages[1:3])
+            self.assertIn('ModemManager', packages)
+            self.assertEqual(mapped[-1].name, data[-1].name)
+            self.assertEqual(
+                list(mapped[-1].packages), list(mapped[1].packages)
+            )
+            self.assertEqual(mapped[-2].name, data[0].name)
+            self.assertRaises(IndexError, mapped.__getitem__, 2)
+            self.assertRaises(IndexError, mapped.__getitem__, -3)
+            index = MaintainedIndex(mapped)
+            self.assertTrue(index.is_maintained('ModemManager'))
+        finally:
+            mapped.close()
+
+    def test_replace(self):
+        '''
+        Test replacing mapped file.
+        '''
+        data = sorted(
+            load_maintained_data(TEST_DATA), key=lambda item: item.name
+        )
+        dump_maintained_map(data, self.filename)
+        mapped = load_maintained_map(self.filename)
+        try:
+            dump_maintained_map(data[:1], self.filename)
+            self.assertEqual(2, len(mapped))
+            self.assertEqual(data[1].packages, list(mapped[1].packages))
+            replaced = load_maintained_map(self.filename)
+            self.assertEqual(1, len(replaced))
+            replaced.close()
+        finally:
+            mapped.close()
+        self.assertEqual(['maintained.map'], os.listdir(self.tempdir))
+
+    def test_invalid(self):
+        '''
+        Test loading invalid file.
+        '''
+        with open(self.filename, 'wb') as handle:
+            handle.write(b'x' * 100)
+        self.assertRaises(ValueError, load_maintained_map, self.filename)
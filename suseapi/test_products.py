@@ -24,7 +24,9 @@ Testing of product name manipulations.
 
 from unittest import TestCase
 
-from suseapi.products import codestream_name, codestream_base
+from suseapi.products import (
+    codestream_name, codestream_base, codestream_names,
+)
 
 PRODUCT_TESTS = (
     ('sles9-sp3', 'SLE-9-SP3', 'SLE-9'),
@@ -36,6 +38,77 @@ PRODUCT_TESTS = (
 )
 
 
+def legacy_codestream_name(name):
+    '''
+    Original implementation of codestream_name used as a reference.
+    '''
+    dist = name.upper().replace(
+        'SLE12', 'SLE-12'
+    ).replace(
+        'SLE11', 'SLE-11'
+    ).replace(
+        'SLE10', 'SLE-10'
+    ).replace(
+        'SLE9', 'SLE-9'
+    ).replace(
+        'SLED9', 'SLE-9'
+    ).replace(
+        'SLED10', 'SLE-10'
+    ).replace(
+        'SLED11', 'SLE-11'
+    ).replace(
+        'SLES9', 'SLE-9'
+    ).replace(
+        'SLES10', 'SLE-10'
+    ).replace(
+        'SLES11', 'SLE-11'
+    ).replace(
+        'OES11', 'OES-11'
+    ).replace(
+        'OES2', 'OES-2'
+    ).replace(
+        '-UPDATE', ''
+    ).replace(
+        '-STAGING', ''
+    )
+    if dist == 'SMT11-SP2':
+        return 'SLE-11-SP2-PRODUCTS'
+
+    if dist == 'SLEPOS10':
+        return 'SLE-10-SP4'
+
+    if '-' in dist:
+        base, end = dist.rsplit('-', 1)
+        if end.startswith('PL') or end.startswith('HWREFRESH'):
+            dist = '%s-HWRefresh' % base
+
+    return dist
+
+
+def get_codestream_spellings():
+    '''
+    Generates all known spellings of codestream names.
+    '''
+    result = [
+        'smt11-sp2', 'SMT11-SP2', 'slepos10', 'slepos11',
+        'openSUSE:12.1', 'openSUSE:13.2', 'opensuse-13.1', 'slert10',
+        'slert11-sp1', 'sles11-sp2-pl3', 'sle11-pl', 'sle10-sp3-hwrefresh',
+        'SLE-11-SP3', 'sles11-sp1-teradata', 'sle-manager-tools12',
+    ]
+    bases = ('sle', 'sles', 'sled', 'SLE', 'SLES', 'SLED', 'oes')
+    for base in bases:
+        for version in ('2', '9', '10', '11', '12'):
+            name = base + version
+            for service_pack in ('', '-sp1', '-sp2', '-sp3', '-sp4'):
+                for suffix in ('', '-update', '-staging', '-pl2',
+                               '-hwrefresh1', '-UPDATE'):
+                    result.append(name + service_pack + suffix)
+    return result
+
+
+CODESTREAM_SPELLINGS = get_codestream_spellings()
+
+
 class ProductTest(TestCase):
     '''
     Tests for product names mapping.
@@ -60,3 +133,22 @@ class ProductTest(TestCase):
                 codestream_base(codestream),
                 expected
             )
+
+    def test_codestream_names(self):
+        '''
+        Tests converting several codestream names.
+        '''
+        self.assertEqual(
+            codestream_names([item[0] for item in PRODUCT_TESTS]),
+            [item[1] for item in PRODUCT_TESTS]
+        )
+
+    def test_legacy(self):
+        '''
+        Tests equivalence with original implementation.
+        '''
+        for name in CODESTREAM_SPELLINGS:
+            expected = legacy_codestream_name(name)
+            self.assertEqual(codestream_name(name), expected)
+            # Second call is served from cache
+            self.assertEqual(codestream_name(name), expected)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Testing of response cache.
+'''
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import httpretty
+
+from suseapi.browser import ResponseCacheMiss, WebScraper
+from suseapi.instrument import Aggregator, add_hook, remove_hook
+from suseapi.responsecache import ResponseCache
+
+TEST_BASE = 'http://example.net'
+
+
+class ResponseCacheTest(TestCase):
+    '''
+    Response cache tests.
+    '''
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        '''
+        Test storing and loading responses.
+        '''
+        key = self.cache.get_key('http://example.net/', 'id=1')
+        self.assertNotEqual(key, self.cache.get_key('http://example.net/'))
+        self.assertNotEqual(
+            key,
+            self.cache.get_key('http://example.net/', 'id=1', user='other')
+        )
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, 'http://example.net/', 200, b'', b'TEST')
+        self.assertEqual(self.cache.get(key)['body'], b'TEST')
+        self.cache.max_age = 0
+        self.assertIsNone(self.cache.get(key))
+        self.cache.max_age = None
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
+
+    def test_evict(self):
+        '''
+        Test evicting least recently used entries.
+        '''
+        self.cache.set('a', '', 200, b'', os.urandom(1000))
+        self.cache.set('b', '', 200, b'', os.urandom(1000))
+        os.utime(self.cache.get_filename('a'), (1, 1))
+        os.utime(self.cache.get_filename('b'), (2, 2))
+        self.cache.get('a')
+        self.cache.max_size = 2500
+        self.cache.set('c', '', 200, b'', os.urandom(1000))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertTrue(self.cache.get_size() <= 2500)
+
+    @httpretty.activate
+    def test_scraper(self):
+        '''
+        Test caching of scraper requests and replay.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            '{0}/{1}'.format(TEST_BASE, 'action'),
+            body='<html><body>TEST</body></html>',
+            content_type='text/html',
+        )
+        scraper = WebScraper(
+            None, None, TEST_BASE, transport='urllib3',
+            response_cache=self.cache
+        )
+        # Requests with side effects are never cached
+        scraper.request('action', id=1)
+        count = len(httpretty.latest_requests())
+        scraper.request('action', id=1)
+        self.assertTrue(count < len(httpretty.latest_requests()))
+
+        aggregator = Aggregator()
+        add_hook(aggregator)
+        try:
+            scraper.fetch('action', id=1)
+            count = len(httpretty.latest_requests())
+            # Served from cache
+            scraper.fetch('action', id=1)
+        finally:
+            remove_hook(aggregator)
+        self.assertEqual(count, len(httpretty.latest_requests()))
+        stats = aggregator.snapshot()[('browser', 'response_cache')]
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertEqual(stats['cache_misses'], 1)
+        self.assertTrue(scraper.viewing_html())
+
+        self.cache.replay = True
+        response = scraper.fetch('action', id=1)
+        self.assertIn('TEST', response.unicode_body())
+        self.assertRaises(ResponseCacheMiss, scraper.fetch, 'action', id=2)
+        # Requests with side effects can not be replayed
+        self.assertRaises(ResponseCacheMiss, scraper.request, 'action', id=1)
+        self.assertEqual(count, len(httpretty.latest_requests()))
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Testing of session stores.
+'''
+
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+import httpretty
+from six.moves.http_cookiejar import Cookie
+
+from suseapi.bugzilla import APIBugzilla
+from suseapi.sessionstore import FileSessionStore
+
+
+def make_cookie(name, value, expires=None):
+    '''
+    Creates cookie object.
+    '''
+    return Cookie(
+        0, name, value, None, False, 'example.net', False, False, '/',
+        False, False, expires, False, None, None, {}
+    )
+
+
+class FileSessionStoreTest(TestCase):
+    '''
+    File based session store tests.
+    '''
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = FileSessionStore(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        '''
+        Test storing and loading cookies.
+        '''
+        self.assertIsNone(self.store.get('key'))
+        self.store.set('key', [make_cookie('session', 'x')])
+        cookies = self.store.get('key')
+        self.assertEqual(cookies[0].name, 'session')
+        self.assertEqual(cookies[0].value, 'x')
+        self.store.delete('key')
+        self.assertIsNone(self.store.get('key'))
+
+    def test_expiry(self):
+        '''
+        Test expired sessions are ignored.
+        '''
+        self.store.set('key', [make_cookie('a', 'b', int(time.time()) - 1)])
+        self.assertIsNone(self.store.get('key'))
+        self.store.ttl = -1
+        self.store.set('key', [])
+        self.assertIsNone(self.store.get('key'))
+
+    def test_lock(self):
+        '''
+        Test locking.
+        '''
+        with self.store.lock('key'):
+            self.store.set('key', [])
+        self.assertEqual(self.store.get('key'), [])
+
+    @httpretty.activate
+    def test_bugzilla(self):
+        '''
+        Test sharing login between Bugzilla instances.
+        '''
+        httpretty.register_uri(
+            httpretty.POST,
+            'https://apibugzilla.suse.com/index.cgi',
+            body='<html><body><a href="#">Log out</a></body></html>',
+            content_type='text/html',
+        )
+        bugzilla = APIBugzilla(
+            'test', 'test', transport='urllib3', session_store=self.store
+        )
+        bugzilla.login()
+        requests = len(httpretty.latest_requests())
+        self.assertEqual(self.store.get(bugzilla.get_session_key()), [])
+
+        bugzilla = APIBugzilla(
+            'test', 'test', transport='urllib3', session_store=self.store
+        )
+        bugzilla.login()
+        self.assertTrue(bugzilla.cookie_set)
+        self.assertEqual(len(httpretty.latest_requests()), requests)
+
+        bugzilla.login(force=True)
+        self.assertTrue(len(httpretty.latest_requests()) > requests)
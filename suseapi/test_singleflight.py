@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2012 - 2015 Michal Čihař <mcihar@suse.cz>
+#
+# This file is part of python-suseapi
+# <https://github.com/openSUSE/python-suseapi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+'''
+Testing of request coalescing.
+'''
+
+import threading
+import time
+from unittest import TestCase
+
+from suseapi.singleflight import MicroBatcher, SingleFlight
+
+
+class SingleFlightTest(TestCase):
+    '''
+    Single flight tests.
+    '''
+    def test_coalesce(self):
+        '''
+        Test concurrent calls share single execution.
+        '''
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.2)
+            return value * 2
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('key', slow, 21))
+            )
+            for dummy in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [21])
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_clone(self):
+        '''
+        Test shared results are copied for every caller.
+        '''
+        flight = SingleFlight(clone=list)
+        results = []
+
+        def slow():
+            time.sleep(0.2)
+            return [1]
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('key', slow))
+            )
+            for dummy in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [[1]] * 3)
+        self.assertEqual(len(set(id(result) for result in results)), 3)
+
+    def test_error(self):
+        '''
+        Test errors are propagated and not remembered.
+        '''
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError('fail')
+
+        self.assertRaises(ValueError, flight.do, 'key', fail)
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+
+
+class MicroBatcherTest(TestCase):
+    '''
+    Micro batching tests.
+    '''
+    def test_batch(self):
+        '''
+        Test requests within window are batched.
+        '''
+        batcher = MicroBatcher(window=0.2)
+        batches = []
+        results = {}
+
+        def fetch(keys):
+            batches.append(sorted(keys))
+            return dict((key, key * 2) for key in keys)
+
+        def worker(key):
+            results[key] = batcher.submit(key, fetch)
+
+        threads = [
+            threading.Thread(target=worker, args=(key,)) for key in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(batches, [[0, 1, 2, 3]])
+        self.assertEqual(results, {0: 0, 1: 2, 2: 4, 3: 6})
+
+    def test_max_size(self):
+        '''
+        Test full batch is executed without waiting for the window.
+        '''
+        batcher = MicroBatcher(window=10, max_size=1)
+        start = time.time()
+        self.assertEqual(batcher.submit(1, lambda keys: {1: 'x'}), 'x')
+        self.assertTrue(time.time() - start < 5)
+
+    def test_clone(self):
+        '''
+        Test shared results are copied for every caller.
+        '''
+        flight = SingleFlight(clone=list)
+        results = []
+
+        def slow():
+            time.sleep(0.2)
+            return [1]
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do('key', slow))
+            )
+            for dummy in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [[1]] * 3)
+        self.assertEqual(len(set(id(result) for result in results)), 3)
+
+    def test_error(self):
+        '''
+        Test per key errors.
+        '''
+        batcher = MicroBatcher(window=0)
+        self.assertRaises(
+            ValueError,
+            batcher.submit, 1, lambda keys: {1: ValueError('fail')}
+        )
+        self.assertIsNone(batcher.submit(1, lambda keys: {}))
@@ -22,11 +22,12 @@
 Testing of SR info fetcher.
 '''
 
+from datetime import timedelta
 from unittest import TestCase
 
 import httpretty
 
-from suseapi.srinfo import SRInfo
+from suseapi.srinfo import SRInfo, ConnectionPool
 
 TEST_RESPONSE = '''<?xml version='1.0'?>
 
@@ -67,6 +68,10 @@ class SRInfoTest(TestCase):
     Test SR information retrieval.
     '''
 
+    def setUp(self):
+        # pylint: disable=protected-access
+        SRInfo._cache.clear()
+
     @httpretty.activate
     def test_status(self):
         '''
@@ -97,3 +102,117 @@ class SRInfoTest(TestCase):
         info = srinfo.get_info(1234567890)
         self.assertEqual(info['cus_account'], 'SOFTWARE')
         self.assertEqual(info['service_level'], '2')
+
+    @httpretty.activate
+    def test_info_invalid(self):
+        '''
+        Test getting information for invalid SR.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1/',
+            body='No SR number',
+        )
+        srinfo = SRInfo()
+        self.assertTrue(srinfo.get_info(1) is None)
+
+    @httpretty.activate
+    def test_info_many(self):
+        '''
+        Test getting information for several SRs.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1234567890/',
+            body=TEST_RESPONSE,
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1/',
+            body='No SR number',
+        )
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/2/',
+            status=500,
+        )
+        srinfo = SRInfo()
+        info = srinfo.get_info_many([1234567890, 1, 2, 1234567890])
+        self.assertEqual(set(info.keys()), set([1234567890, 1]))
+        self.assertEqual(info[1234567890]['cus_account'], 'SOFTWARE')
+        self.assertTrue(info[1] is None)
+
+        info = srinfo.get_info_many([2], store_errors=True)
+        self.assertTrue(isinstance(info[2], IOError))
+
+        self.assertEqual({}, srinfo.get_info_many([]))
+
+    # pylint: disable=protected-access
+    @httpretty.activate
+    def test_keepalive(self):
+        '''
+        Test that connections are reused.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srstatus/1234567890/',
+            body='Closed',
+            forcing_headers={'Content-Length': '6'},
+        )
+        pool = ConnectionPool('http://kueue.hwlab.suse.de:8080/')
+        srinfo = SRInfo()
+        srinfo.pool = pool
+        srinfo.get_status(1234567890)
+        self.assertEqual(1, pool._pool.qsize())
+        self.assertEqual(b'Closed', srinfo.get_status(1234567890))
+        self.assertEqual(1, pool._pool.qsize())
+        pool.close()
+        self.assertEqual(0, pool._pool.qsize())
+
+    @httpretty.activate
+    def test_info_cache(self):
+        '''
+        Test caching of SR information.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1234567890/',
+            body=TEST_RESPONSE,
+        )
+        srinfo = SRInfo()
+        info = srinfo.get_info(1234567890)
+        self.assertTrue(srinfo.get_info(1234567890) is info)
+        self.assertEqual(1, len(httpretty.latest_requests()))
+
+        # Revalidation keeps unchanged entry
+        srinfo.cache_ttl = timedelta(0)
+        self.assertTrue(srinfo.get_info(1234567890) is info)
+        self.assertEqual(2, len(httpretty.latest_requests()))
+
+        # Changed entry is parsed again
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1234567890/',
+            body=TEST_RESPONSE.replace('2013-10-10', '2013-11-11'),
+        )
+        updated = srinfo.get_info(1234567890)
+        self.assertFalse(updated is info)
+        self.assertEqual(updated['lastupdate'].month, 11)
+
+    @httpretty.activate
+    def test_info_negative_cache(self):
+        '''
+        Test caching of invalid SR.
+        '''
+        httpretty.register_uri(
+            httpretty.GET,
+            'http://kueue.hwlab.suse.de:8080/srinfo/1/',
+            body='No SR number',
+        )
+        srinfo = SRInfo()
+        self.assertTrue(srinfo.get_info(1) is None)
+        self.assertTrue(srinfo.get_info(1) is None)
+        self.assertEqual(1, len(httpretty.latest_requests()))
+        srinfo.negative_ttl = timedelta(0)
+        self.assertTrue(srinfo.get_info(1) is None)
+        self.assertEqual(2, len(httpretty.latest_requests()))
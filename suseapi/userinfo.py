@@ -24,6 +24,7 @@ Simple wrapper around LDAP module to allow easier search.
 
 import ldap
 from suseapi.cacher import CacherMixin, DjangoCacherMixin
+from suseapi.instrument import measure, record_cache
 
 
 class UserInfo(CacherMixin):
@@ -70,17 +71,18 @@ class UserInfo(CacherMixin):
         :param attribs: attributes to return
         """
         filterstring = '({0}={1})'.format(attr, val)
-        try:
-            return self._ldap.search_s(
-                self._base,
-                # pylint: disable=E1101
-                ldap.SCOPE_SUBTREE,
-                filterstring,
-                attribs
-            )
-        # pylint: disable=E1101
-        except ldap.NO_SUCH_OBJECT:
-            return []
+        with measure('userinfo', 'search'):
+            try:
+                return self._ldap.search_s(
+                    self._base,
+                    # pylint: disable=E1101
+                    ldap.SCOPE_SUBTREE,
+                    filterstring,
+                    attribs
+                )
+            # pylint: disable=E1101
+            except ldap.NO_SUCH_OBJECT:
+                return []
 
     def fixup_department(self, name):
         '''
@@ -96,6 +98,7 @@ class UserInfo(CacherMixin):
         Returns user department.
         '''
         department = self.cache_get(user)
+        record_cache('userinfo', 'department', department is not None)
         if department is not None:
             return department
 